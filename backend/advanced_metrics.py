@@ -15,13 +15,53 @@ Key Improvements:
 - Event quality validation
 """
 
+import os
 import re
 import math
-from typing import Dict, List, Any, Tuple
-from datetime import datetime, timedelta
+import heapq
+import operator
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from functools import lru_cache
+from itertools import accumulate, islice
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+from datetime import datetime
 from dataclasses import dataclass
 from enum import Enum
 
+import numpy as np
+
+# Sort sentinel for events without timestamps
+_DT_MIN = datetime.min
+
+# Max time between an error and the resolution that fixes it
+_RESOLUTION_WINDOW = np.timedelta64(5, 'm')
+
+# Compact codes for the event types the calculator inspects; anything else
+# maps to OTHER_EVENT_CODE in the columnar type array
+EVENT_CODES = {
+    event_type: code for code, event_type in enumerate([
+        'SQL_RUN', 'SCHEMA_EXPLORED', 'TABLE_PREVIEWED', 'DATA_QUALITY_CHECKED',
+        'QUERY_MODIFIED', 'APPROACH_CHANGED', 'BACKTRACKED', 'VALIDATION_ATTEMPT',
+        'ERROR_OCCURRED', 'ERROR_RESOLVED', 'AI_PROMPT', 'AI_RESPONSE_USED',
+        'AI_CODE_MODIFIED', 'AI_CODE_COPIED'
+    ])
+}
+OTHER_EVENT_CODE = 255
+
+
+@lru_cache(maxsize=1024)
+def _confidence(sample_size: int, optimal_size: int = 20) -> float:
+    """Sigmoid confidence for a sample size (memoized; inputs are small ints)"""
+    if sample_size == 0:
+        return 0.0
+    # Sigmoid: 1 / (1 + e^(-k*(x - mid)))
+    k = 6 / optimal_size  # Steepness
+    mid = optimal_size / 2
+    confidence = 1 / (1 + math.exp(-k * (sample_size - mid)))
+    return min(1.0, confidence)
+
 
 class AIUsageIntent(Enum):
     """Classify AI interaction intent"""
@@ -33,16 +73,25 @@ class AIUsageIntent(Enum):
     EXPLANATION = "explanation"          # Explain existing code
 
 
-@dataclass
+@dataclass(slots=True)
 class ConfidenceMetric:
     """Metric with confidence interval"""
     value: float
     confidence: float  # 0.0 to 1.0
     sample_size: int
     interpretation: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to a plain dict (slots instances have no __dict__)"""
+        return {
+            "value": self.value,
+            "confidence": self.confidence,
+            "sample_size": self.sample_size,
+            "interpretation": self.interpretation
+        }
 
 
-@dataclass
+@dataclass(slots=True)
 class SequencePattern:
     """Detected behavioral sequence"""
     pattern_type: str
@@ -71,6 +120,48 @@ class AdvancedMetricsCalculator:
         "min_sample_size": 5
     }
     
+    # Intent keywords in priority order (substring semantics)
+    _INTENT_KEYWORDS = [
+        (AIUsageIntent.HINT_REQUEST, ['hint', 'clue', 'guide', 'approach']),
+        (AIUsageIntent.DEBUG_ASSISTANCE, ['error', 'bug', 'wrong', 'fix', 'debug']),
+        (AIUsageIntent.EXPLANATION, ['explain', 'what is', 'how does', 'why']),
+        (AIUsageIntent.CODE_GENERATION, ['write', 'code', 'query', 'generate', 'create']),
+        (AIUsageIntent.VALIDATION, ['correct', 'right', 'check', 'validate', 'verify']),
+    ]
+    _INTENT_PRIORITY = {intent.name: rank for rank, (intent, _) in enumerate(_INTENT_KEYWORDS)}
+    
+    # All intent keywords as one zero-width scan: every start position is
+    # visited, and at each one the highest-priority keyword starting there
+    # is reported, so overlapping keywords are never hidden from each other.
+    _INTENT_PATTERN = re.compile('(?=' + '|'.join(
+        f"(?P<{intent.name}>{'|'.join(map(re.escape, words))})"
+        for intent, words in _INTENT_KEYWORDS
+    ) + ')')
+    
+    # Minimum gap between iteration events for them to count as meaningful
+    _MEANINGFUL_ITERATION_GAP = np.timedelta64(10, 's')
+    
+    # Paren depth tracking for subquery nesting
+    _NON_PAREN_PATTERN = re.compile(r'[^()]+')
+    _PAREN_STEP = {'(': 1, ')': -1}
+    
+    # Structural SQL tokens, matched case-insensitively against the raw query
+    _SQL_STRUCTURE_PATTERN = re.compile(
+        r'(?P<join>\bJOIN\b)'
+        r'|(?P<cte>\bWITH(?=\s+\w+\s+AS))'
+        r'|(?P<agg>\b(?:COUNT|SUM|AVG|MIN|MAX|STDDEV|VARIANCE)(?=\s*\())'
+        r'|(?P<window>\bOVER(?=\s*\())',
+        re.IGNORECASE
+    )
+    _SQL_MARKER_PATTERN = re.compile(r'JOIN|WITH', re.IGNORECASE)
+    
+    # Field order of cached _analyze_query results
+    _SQL_ANALYSIS_KEYS = (
+        "complexity_score", "category", "join_depth", "nesting_level",
+        "cte_count", "aggregations", "window_functions"
+    )
+    _BASIC_SQL_ANALYSIS = (0.0, "basic", 0, 0, 0, 0, 0)
+    
     def __init__(self, events: List[Dict], ai_interactions: List[Dict], 
                  problem_difficulty: float = 1.0):
         """
@@ -81,18 +172,56 @@ class AdvancedMetricsCalculator:
             ai_interactions: AI interaction logs
             problem_difficulty: Normalization factor (0.5 = easy, 1.0 = medium, 1.5 = hard)
         """
-        self.events = sorted(events, key=lambda e: e.get('timestamp', datetime.min))
+        self.events = list(events)
+        # Event streams usually arrive in order already; only sort when needed
+        sort_keys = [e.get('timestamp', _DT_MIN) for e in self.events]
+        if any(map(operator.gt, sort_keys, islice(sort_keys, 1, None))):
+            order = sorted(range(len(sort_keys)), key=sort_keys.__getitem__)
+            self.events = [self.events[i] for i in order]
         self.ai_interactions = ai_interactions
         self.problem_difficulty = problem_difficulty
-        self.event_counts = self._count_events()
+        self._index_events()
+        self._classifications = None
+        
+    def _index_events(self):
+        """
+        Aggregate the event stream in a single pass
         
-    def _count_events(self) -> Dict[str, int]:
-        """Count events by type"""
-        counts = {}
-        for event in self.events:
+        Builds per-type counts, event lists and stream positions (in
+        timestamp order), the type at each position, the executed SQL queries
+        and the time of the first SQL run, so metrics never re-scan the full
+        event list. Types and timestamps are also kept as parallel numpy
+        columns (missing timestamps become NaT) for vectorized metrics.
+        """
+        self._events_by_type = defaultdict(list)
+        self._positions_by_type = defaultdict(list)
+        self._event_types = []
+        self._sql_queries = []
+        for position, event in enumerate(self.events):
             event_type = event.get('type', 'UNKNOWN')
-            counts[event_type] = counts.get(event_type, 0) + 1
-        return counts
+            self._event_types.append(event_type)
+            self._events_by_type[event_type].append(event)
+            self._positions_by_type[event_type].append(position)
+            if event_type == 'SQL_RUN':
+                query = event.get('metadata', {}).get('query')
+                if query:
+                    self._sql_queries.append(query)
+        
+        self._type_codes = np.fromiter(
+            (EVENT_CODES.get(t, OTHER_EVENT_CODE) for t in self._event_types),
+            dtype=np.uint8, count=len(self._event_types)
+        )
+        self._timestamps = np.array(
+            [e.get('timestamp') for e in self.events], dtype='datetime64[us]'
+        )
+        
+        self.event_counts = Counter({t: len(bucket) for t, bucket in self._events_by_type.items()})
+        sql_events = self._events_by_type.get('SQL_RUN')
+        self._first_sql_time = sql_events[0].get('timestamp') if sql_events else None
+    
+    def _type_mask(self, *event_types: str) -> np.ndarray:
+        """Boolean mask over the event stream selecting the given types"""
+        return np.isin(self._type_codes, [EVENT_CODES[t] for t in event_types])
     
     def _confidence_from_sample_size(self, sample_size: int, 
                                      optimal_size: int = 20) -> float:
@@ -108,13 +237,7 @@ class AdvancedMetricsCalculator:
         Returns:
             Confidence score 0.0-1.0
         """
-        if sample_size == 0:
-            return 0.0
-        # Sigmoid: 1 / (1 + e^(-k*(x - mid)))
-        k = 6 / optimal_size  # Steepness
-        mid = optimal_size / 2
-        confidence = 1 / (1 + math.exp(-k * (sample_size - mid)))
-        return min(1.0, confidence)
+        return _confidence(sample_size, optimal_size)
     
     def calculate_exploration_score(self) -> ConfidenceMetric:
         """
@@ -125,38 +248,32 @@ class AdvancedMetricsCalculator:
         - Confidence based on total activity volume
         - Normalized by problem difficulty
         """
-        exploration_events = [
-            e for e in self.events 
-            if e.get('type') in ['SCHEMA_EXPLORED', 'TABLE_PREVIEWED', 'DATA_QUALITY_CHECKED']
+        exploration_times = self._timestamps[
+            self._type_mask('SCHEMA_EXPLORED', 'TABLE_PREVIEWED', 'DATA_QUALITY_CHECKED')
         ]
+        exploration_count = len(exploration_times)
         
         sql_runs = self.event_counts.get('SQL_RUN', 0)
         
         if sql_runs == 0:
             return ConfidenceMetric(0.0, 0.0, 0, "no_sql_activity")
         
-        # Calculate temporal weighting (earlier exploration = better)
-        if exploration_events and self.events:
-            first_sql_time = next(
-                (e['timestamp'] for e in self.events if e.get('type') == 'SQL_RUN'),
-                None
-            )
-            if first_sql_time:
-                early_explorations = sum(
-                    1 for e in exploration_events 
-                    if e.get('timestamp', datetime.max) < first_sql_time
-                )
-                weighted_explorations = early_explorations * 1.5 + (len(exploration_events) - early_explorations)
-            else:
-                weighted_explorations = len(exploration_events)
+        # Calculate temporal weighting (earlier exploration = better).
+        # Explorations without a timestamp (NaT) never count as early.
+        first_sql_time = self._first_sql_time
+        if exploration_count and first_sql_time:
+            early_explorations = int(np.count_nonzero(
+                exploration_times < np.datetime64(first_sql_time, 'us')
+            ))
+            weighted_explorations = early_explorations * 1.5 + (exploration_count - early_explorations)
         else:
-            weighted_explorations = len(exploration_events)
+            weighted_explorations = exploration_count
         
         # Normalize by difficulty
         score = (weighted_explorations / sql_runs) / self.problem_difficulty
         
         # Confidence from total activity
-        total_activity = sql_runs + len(exploration_events)
+        total_activity = sql_runs + exploration_count
         confidence = self._confidence_from_sample_size(total_activity, optimal_size=15)
         
         # Interpretation
@@ -183,28 +300,21 @@ class AdvancedMetricsCalculator:
         - Weights meaningful iteration higher
         - Considers result improvement
         """
-        iteration_events = [
-            e for e in self.events 
-            if e.get('type') in ['QUERY_MODIFIED', 'APPROACH_CHANGED', 'BACKTRACKED', 'VALIDATION_ATTEMPT']
+        iteration_times = self._timestamps[
+            self._type_mask('QUERY_MODIFIED', 'APPROACH_CHANGED', 'BACKTRACKED', 'VALIDATION_ATTEMPT')
         ]
         
         sql_runs = max(self.event_counts.get('SQL_RUN', 0), 1)
         
-        # Filter superficial iterations (< 10 seconds apart)
-        meaningful_iterations = []
-        last_time = None
-        for event in iteration_events:
-            timestamp = event.get('timestamp')
-            if last_time and timestamp:
-                delta = (timestamp - last_time).total_seconds()
-                if delta > 10:  # More than 10s = meaningful
-                    meaningful_iterations.append(event)
-            else:
-                meaningful_iterations.append(event)
-            last_time = timestamp
+        # Filter superficial iterations (< 10 seconds apart). A missing
+        # timestamp (NaT) on either side, like the first event, always
+        # counts as meaningful.
+        gaps = np.diff(iteration_times)
+        meaningful_gaps = (gaps > self._MEANINGFUL_ITERATION_GAP) | np.isnat(gaps)
+        meaningful_count = min(len(iteration_times), 1) + int(np.count_nonzero(meaningful_gaps))
         
         # Calculate score
-        score = len(meaningful_iterations) / sql_runs
+        score = meaningful_count / sql_runs
         confidence = self._confidence_from_sample_size(sql_runs, optimal_size=10)
         
         if score > self.THRESHOLDS['iteration_high']:
@@ -217,7 +327,7 @@ class AdvancedMetricsCalculator:
         return ConfidenceMetric(
             value=min(score, 2.0),
             confidence=confidence,
-            sample_size=len(meaningful_iterations),
+            sample_size=meaningful_count,
             interpretation=interp
         )
     
@@ -230,25 +340,27 @@ class AdvancedMetricsCalculator:
         - Detects repeated same errors (stuck pattern)
         - No double-counting in numerator/denominator
         """
-        errors = [e for e in self.events if e.get('type') == 'ERROR_OCCURRED']
-        resolutions = [e for e in self.events if e.get('type') == 'ERROR_RESOLVED']
+        error_times = self._timestamps[self._type_mask('ERROR_OCCURRED')]
+        error_count = len(error_times)
         
-        if not errors:
+        if not error_count:
             return ConfidenceMetric(1.0, 0.0, 0, "no_errors_encountered")
         
-        # Match errors to resolutions by proximity
+        # Match errors to resolutions by proximity: binary-search each error
+        # into the sorted resolution times and check the first later one
+        # falls within 5 minutes. Events without timestamps never match.
+        res_times = np.sort(self._timestamps[self._type_mask('ERROR_RESOLVED')])
+        res_times = res_times[~np.isnat(res_times)]
         resolved_count = 0
-        for error in errors:
-            error_time = error.get('timestamp', datetime.min)
-            # Look for resolution within 5 minutes
-            for resolution in resolutions:
-                res_time = resolution.get('timestamp', datetime.max)
-                if error_time < res_time < error_time + timedelta(minutes=5):
-                    resolved_count += 1
-                    break
+        if len(res_times):
+            next_idx = np.searchsorted(res_times, error_times, side='right')
+            next_res = res_times[np.minimum(next_idx, len(res_times) - 1)]
+            resolved_count = int(np.count_nonzero(
+                (next_idx < len(res_times)) & (next_res < error_times + _RESOLUTION_WINDOW)
+            ))
         
-        score = resolved_count / len(errors)
-        confidence = self._confidence_from_sample_size(len(errors), optimal_size=8)
+        score = resolved_count / error_count
+        confidence = self._confidence_from_sample_size(error_count, optimal_size=8)
         
         if score > self.THRESHOLDS['debug_strong']:
             interp = "strong_debugger"
@@ -260,7 +372,7 @@ class AdvancedMetricsCalculator:
         return ConfidenceMetric(
             value=score,
             confidence=confidence,
-            sample_size=len(errors),
+            sample_size=error_count,
             interpretation=interp
         )
     
@@ -273,28 +385,34 @@ class AdvancedMetricsCalculator:
         - Uses prompt content analysis
         - Tracks response usage patterns
         """
+        if self._classifications is not None:
+            return self._classifications
+        
         classifications = {intent.value: 0 for intent in AIUsageIntent}
         
         for interaction in self.ai_interactions:
             prompt = interaction.get('user_prompt', '').lower()
             
-            # Keyword-based classification
-            if any(word in prompt for word in ['hint', 'clue', 'guide', 'approach']):
-                classifications[AIUsageIntent.HINT_REQUEST.value] += 1
-            elif any(word in prompt for word in ['error', 'bug', 'wrong', 'fix', 'debug']):
-                classifications[AIUsageIntent.DEBUG_ASSISTANCE.value] += 1
-            elif any(word in prompt for word in ['explain', 'what is', 'how does', 'why']):
-                classifications[AIUsageIntent.EXPLANATION.value] += 1
-            elif any(word in prompt for word in ['write', 'code', 'query', 'generate', 'create']):
-                classifications[AIUsageIntent.CODE_GENERATION.value] += 1
-            elif any(word in prompt for word in ['correct', 'right', 'check', 'validate', 'verify']):
-                classifications[AIUsageIntent.VALIDATION.value] += 1
-            else:
-                classifications[AIUsageIntent.CONCEPTUAL_HELP.value] += 1
+            # Keyword-based classification (highest-priority match wins)
+            classifications[self._classify_prompt(prompt).value] += 1
         
+        self._classifications = classifications
         return classifications
     
-    def calculate_ai_reliance(self) -> ConfidenceMetric:
+    def _classify_prompt(self, prompt: str) -> AIUsageIntent:
+        """Classify a lowercased prompt with a single keyword scan"""
+        best_rank = None
+        for match in self._INTENT_PATTERN.finditer(prompt):
+            rank = self._INTENT_PRIORITY[match.lastgroup]
+            if best_rank is None or rank < best_rank:
+                best_rank = rank
+                if rank == 0:
+                    break
+        if best_rank is None:
+            return AIUsageIntent.CONCEPTUAL_HELP
+        return self._INTENT_KEYWORDS[best_rank][0]
+    
+    def calculate_ai_reliance(self, classifications: Optional[Dict[str, int]] = None) -> ConfidenceMetric:
         """
         Nuanced AI reliance calculation
         
@@ -302,11 +420,15 @@ class AdvancedMetricsCalculator:
         - Code generation weighted higher than conceptual help
         - Validation/hints weighted lower (healthy usage)
         - Based on intent classification, not raw counts
+        
+        Args:
+            classifications: Precomputed intent breakdown (computed if omitted)
         """
         if not self.ai_interactions:
             return ConfidenceMetric(0.0, 1.0, 0, "no_ai_usage")
         
-        classifications = self.classify_ai_interactions()
+        if classifications is None:
+            classifications = self.classify_ai_interactions()
         total_prompts = len(self.ai_interactions)
         
         # Weighted dependency score
@@ -384,32 +506,35 @@ class AdvancedMetricsCalculator:
         - Window function usage
         - CTE structure
         """
-        query_upper = query.upper()
-        
-        # Count join depth
-        join_count = len(re.findall(r'\bJOIN\b', query_upper))
+        return dict(zip(self._SQL_ANALYSIS_KEYS, self._analyze_query(query)))
+    
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _analyze_query(cls, query: str) -> Tuple:
+        """
+        Analyze one query, memoized so repeated queries (retries, re-runs)
+        are only scanned once. Returns values in _SQL_ANALYSIS_KEYS order.
+        """
+        # Most queries have no structural markers at all: every counted
+        # token needs a JOIN, a WITH or a paren, so bail out before the scan
+        if '(' not in query and not cls._SQL_MARKER_PATTERN.search(query):
+            return cls._BASIC_SQL_ANALYSIS
+        
+        # Count joins, CTEs, aggregations and window functions in one scan.
+        # Lookaheads keep matches zero-width past the keyword so tokens are
+        # counted exactly as independent searches would.
+        counts = Counter(m.lastgroup for m in cls._SQL_STRUCTURE_PATTERN.finditer(query))
+        join_count = counts['join']
+        cte_count = counts['cte']
+        agg_functions = counts['agg']
+        window_funcs = counts['window']
         
         # Measure subquery nesting (count nested parentheses with SELECT)
-        nesting_level = 0
         max_nesting = 0
-        for char in query_upper:
-            if char == '(':
-                nesting_level += 1
-                max_nesting = max(max_nesting, nesting_level)
-            elif char == ')':
-                nesting_level -= 1
-        
-        # Count CTEs
-        cte_count = len(re.findall(r'\bWITH\s+\w+\s+AS', query_upper))
-        
-        # Aggregation complexity
-        agg_functions = len(re.findall(
-            r'\b(COUNT|SUM|AVG|MIN|MAX|STDDEV|VARIANCE)\s*\(',
-            query_upper
-        ))
-        
-        # Window functions
-        window_funcs = len(re.findall(r'\bOVER\s*\(', query_upper))
+        if '(' in query:
+            # Strip everything but parens in C, then take the peak running depth
+            parens = cls._NON_PAREN_PATTERN.sub('', query)
+            max_nesting = max(0, max(accumulate(map(cls._PAREN_STEP.__getitem__, parens))))
         
         # Calculate complexity score
         complexity = (
@@ -430,15 +555,8 @@ class AdvancedMetricsCalculator:
         else:
             category = "basic"
         
-        return {
-            "complexity_score": complexity,
-            "category": category,
-            "join_depth": join_count,
-            "nesting_level": max_nesting,
-            "cte_count": cte_count,
-            "aggregations": agg_functions,
-            "window_functions": window_funcs
-        }
+        return (complexity, category, join_count, max_nesting,
+                cte_count, agg_functions, window_funcs)
     
     def calculate_sql_complexity(self, queries: List[str]) -> ConfidenceMetric:
         """
@@ -456,8 +574,7 @@ class AdvancedMetricsCalculator:
         confidence = self._confidence_from_sample_size(len(queries), optimal_size=10)
         
         # Get most common category
-        categories = [a['category'] for a in analyses]
-        most_common = max(set(categories), key=categories.count)
+        most_common = Counter(a['category'] for a in analyses).most_common(1)[0][0]
         
         return ConfidenceMetric(
             value=normalized,
@@ -480,13 +597,16 @@ class AdvancedMetricsCalculator:
         
         # Gold standard: Explore before SQL
         explore_then_sql = []
-        for i, event in enumerate(self.events):
-            if event.get('type') in ['SCHEMA_EXPLORED', 'TABLE_PREVIEWED']:
-                # Look for SQL within next 5 events
-                for j in range(i+1, min(i+6, len(self.events))):
-                    if self.events[j].get('type') == 'SQL_RUN':
-                        explore_then_sql.append((event, self.events[j]))
-                        break
+        sql_positions = self._positions_by_type.get('SQL_RUN', [])
+        explore_positions = heapq.merge(
+            self._positions_by_type.get('SCHEMA_EXPLORED', []),
+            self._positions_by_type.get('TABLE_PREVIEWED', [])
+        )
+        for i in explore_positions:
+            # Look for SQL within next 5 events
+            k = bisect_right(sql_positions, i)
+            if k < len(sql_positions) and sql_positions[k] <= i + 5:
+                explore_then_sql.append((self.events[i], self.events[sql_positions[k]]))
         
         if explore_then_sql:
             patterns.append(SequencePattern(
@@ -497,16 +617,16 @@ class AdvancedMetricsCalculator:
             ))
         
         # Dependency loop: Error → AI → Still Error
-        for i, event in enumerate(self.events):
-            if event.get('type') == 'ERROR_OCCURRED' and i < len(self.events) - 2:
-                if (self.events[i+1].get('type') == 'AI_PROMPT' and
-                    self.events[i+2].get('type') == 'ERROR_OCCURRED'):
-                    patterns.append(SequencePattern(
-                        pattern_type="ai_dependency_loop",
-                        events=["ERROR", "AI", "ERROR"],
-                        timestamp_range=(event['timestamp'], self.events[i+2]['timestamp']),
-                        quality_score=0.2
-                    ))
+        types = self._event_types
+        for i in self._positions_by_type.get('ERROR_OCCURRED', []):
+            if (i < len(types) - 2 and types[i+1] == 'AI_PROMPT'
+                    and types[i+2] == 'ERROR_OCCURRED'):
+                patterns.append(SequencePattern(
+                    pattern_type="ai_dependency_loop",
+                    events=["ERROR", "AI", "ERROR"],
+                    timestamp_range=(self.events[i]['timestamp'], self.events[i+2]['timestamp']),
+                    quality_score=0.2
+                ))
         
         return patterns
     
@@ -517,20 +637,16 @@ class AdvancedMetricsCalculator:
         Returns:
             Comprehensive metrics dictionary with confidence scores
         """
+        # AI reliance feeds independence, so classify and score it up front
+        ai_intent_breakdown = self.classify_ai_interactions()
+        ai_reliance = self.calculate_ai_reliance(ai_intent_breakdown)
+        
+        # Calculate the remaining metrics from precomputed state
         exploration = self.calculate_exploration_score()
         iteration = self.calculate_iteration_quality()
         debug = self.calculate_debug_effectiveness()
-        ai_reliance = self.calculate_ai_reliance()
         ai_collab = self.calculate_ai_collaboration_quality()
-        
-        # Extract SQL queries from events
-        queries = [
-            e.get('metadata', {}).get('query', '')
-            for e in self.events
-            if e.get('type') == 'SQL_RUN' and e.get('metadata', {}).get('query')
-        ]
-        sql_complexity = self.calculate_sql_complexity(queries)
-        
+        sql_complexity = self.calculate_sql_complexity(self._sql_queries)
         sequences = self.detect_thinking_sequences()
         
         # Calculate independence (inverse of reliance)
@@ -542,13 +658,13 @@ class AdvancedMetricsCalculator:
         )
         
         return {
-            "exploration": exploration.__dict__,
-            "iteration": iteration.__dict__,
-            "debugging": debug.__dict__,
-            "ai_reliance": ai_reliance.__dict__,
-            "ai_collaboration": ai_collab.__dict__,
-            "sql_complexity": sql_complexity.__dict__,
-            "independence": independence.__dict__,
+            "exploration": exploration.to_dict(),
+            "iteration": iteration.to_dict(),
+            "debugging": debug.to_dict(),
+            "ai_reliance": ai_reliance.to_dict(),
+            "ai_collaboration": ai_collab.to_dict(),
+            "sql_complexity": sql_complexity.to_dict(),
+            "independence": independence.to_dict(),
             "thinking_sequences": [
                 {
                     "type": seq.pattern_type,
@@ -556,7 +672,7 @@ class AdvancedMetricsCalculator:
                     "events": seq.events
                 } for seq in sequences
             ],
-            "ai_intent_breakdown": self.classify_ai_interactions(),
+            "ai_intent_breakdown": ai_intent_breakdown,
             "problem_difficulty": self.problem_difficulty,
             "overall_confidence": sum([
                 exploration.confidence,
@@ -567,3 +683,40 @@ class AdvancedMetricsCalculator:
             ]) / 5
         }
 
+
+
+def _calculate_one(candidate: Tuple[List[Dict], List[Dict], float]) -> Dict[str, Any]:
+    """Worker entry point for calculate_batch (must be picklable)"""
+    events, ai_interactions, problem_difficulty = candidate
+    calculator = AdvancedMetricsCalculator(
+        events=events,
+        ai_interactions=ai_interactions,
+        problem_difficulty=problem_difficulty
+    )
+    return calculator.calculate_all_metrics()
+
+
+def calculate_batch(
+    candidates: List[Tuple[List[Dict], List[Dict], float]],
+    max_workers: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Calculate metrics for many candidates in parallel
+    
+    Each candidate is scored in a separate process, so the pure-Python
+    metric work is not serialized by the GIL.
+    
+    Args:
+        candidates: (events, ai_interactions, problem_difficulty) per candidate
+        max_workers: Process count (defaults to CPU count)
+    
+    Returns:
+        calculate_all_metrics() output for each candidate, in input order
+    """
+    if not candidates:
+        return []
+    
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(candidates) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_calculate_one, candidates, chunksize=chunksize))
@@ -5,10 +5,17 @@ This AI never interacts with candidates directly.
 V2.0: Advanced metrics system with confidence weighting, sequence analysis, and structural SQL evaluation.
 """
 
-import json
-from typing import Dict, List, Any, Optional
+import orjson
+import asyncio
+import numpy as np
+import time
+import hashlib
+import threading
+from collections import Counter, OrderedDict, namedtuple
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable, ContextManager
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from models import Event, AIInteraction, Session as SessionModel, EVENT_CATEGORIES
 from langchain_config import get_ai_engine
 from advanced_metrics import AdvancedMetricsCalculator
@@ -16,165 +23,102 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-
-class BehaviorAnalyzer:
-    """Analyzes candidate events and generates recruiter insights using AI"""
-    
-    def __init__(self):
-        self.ai_engine = None
-        try:
-            self.ai_engine = get_ai_engine()
-        except Exception as e:
-            logger.warning(f"AI engine not initialized for BehaviorAnalyzer: {e}")
-    
-    async def analyze_session(
-        self, 
-        session_id: str, 
-        db: Session
-    ) -> Dict[str, Any]:
-        """
-        Analyze complete interview session and generate insights
-        
-        Args:
-            session_id: Session to analyze
-            db: Database session
-        
-        Returns:
-            Comprehensive analysis with scores, insights, and recommendations
-        """
-        # Fetch session data
-        session = db.query(SessionModel).filter(SessionModel.session_id == session_id).first()
-        if not session:
-            return {"error": "Session not found"}
-        
-        # Fetch all events and AI interactions
-        events = db.query(Event).filter(
-            Event.session_id == session_id
-        ).order_by(Event.sequence_number).all()
-        
-        ai_interactions = db.query(AIInteraction).filter(
-            AIInteraction.session_id == session_id
-        ).order_by(AIInteraction.timestamp).all()
-        
-        # Build analysis context
-        analysis_context = self._build_analysis_context(
-            session, events, ai_interactions
-        )
-        
-        # Generate AI insights
-        insights = await self._generate_insights(analysis_context)
-        
-        return insights
-    
-    def _build_analysis_context(
-        self,
-        session: SessionModel,
-        events: List[Event],
-        ai_interactions: List[AIInteraction]
-    ) -> Dict[str, Any]:
-        """Build structured context for AI analysis with advanced metrics"""
-        
-        # Prepare events for advanced calculator
-        event_data = [
-            {
-                "type": e.event_type,
-                "timestamp": e.timestamp,
-                "metadata": e.event_metadata or {}
-            }
-            for e in events
-        ]
-        
-        # Prepare AI interactions
-        ai_data = [
-            {
-                "user_prompt": ai.user_prompt,
-                "ai_response": ai.ai_response,
-                "intent_label": ai.intent_label,
-                "response_used": ai.response_used,
-                "timestamp": ai.timestamp
+# ============================================================================
+# INSTRUMENTATION
+# ============================================================================
+# Per-stage wall time / call counts and analysis counters, process-wide
+
+STAGE_NS: Counter = Counter()
+STAGE_COUNT: Counter = Counter()
+ANALYSIS_COUNTERS: Counter = Counter()
+
+
+@contextmanager
+def _stage(name: str):
+    """Accumulate wall time of a block under the given stage name"""
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        STAGE_NS[name] += time.perf_counter_ns() - start
+        STAGE_COUNT[name] += 1
+
+
+def get_analysis_stats() -> Dict[str, Any]:
+    """Snapshot of stage timings and counters for the analyze path"""
+    return {
+        "stages": {
+            name: {
+                "count": STAGE_COUNT[name],
+                "total_ms": round(STAGE_NS[name] / 1e6, 3),
+                "avg_ms": round(STAGE_NS[name] / 1e6 / STAGE_COUNT[name], 3),
             }
-            for ai in ai_interactions
-        ]
-        
-        # Determine problem difficulty (you can enhance this based on problem metadata)
-        problem_difficulty = 1.0  # Default medium difficulty
-        if session.problem_id:
-            # TODO: Look up problem difficulty from problems database
-            # For now, use default
-            pass
-        
-        # Calculate advanced metrics
-        calculator = AdvancedMetricsCalculator(
-            events=event_data,
-            ai_interactions=ai_data,
-            problem_difficulty=problem_difficulty
-        )
-        advanced_metrics = calculator.calculate_all_metrics()
-        
-        # Categorize events for context
-        event_summary = {}
-        for category, event_types in EVENT_CATEGORIES.items():
-            event_summary[category] = [
-                {
-                    "type": e.event_type,
-                    "timestamp": e.timestamp.isoformat() if e.timestamp else None,
-                    "metadata": e.event_metadata
-                }
-                for e in events if e.event_type in event_types
-            ]
-        
-        # Extract SQL queries with full context
-        sql_queries = []
-        for e in events:
-            if e.event_type == "SQL_RUN" and e.event_metadata:
-                sql_queries.append({
-                    "query": e.event_metadata.get("query", ""),
-                    "result": e.event_metadata.get("result"),
-                    "error": e.event_metadata.get("error"),
-                    "timestamp": e.timestamp.isoformat() if e.timestamp else None
-                })
-        
-        # Calculate session metrics
-        duration = None
-        if session.end_time:
-            duration = (session.end_time - session.start_time).total_seconds() / 60
-        
-        # Interview phase data
-        interview_qa = []
-        if session.phase in ["interview", "completed"]:
-            interview_qa = [
-                {
-                    "type": e.event_type,
-                    "content": e.event_metadata.get("question") or e.event_metadata.get("answer", ""),
-                    "timestamp": e.timestamp.isoformat() if e.timestamp else None
-                }
-                for e in events 
-                if e.event_type in ["INTERVIEW_QUESTION", "INTERVIEW_ANSWER"]
-            ]
-        
-        return {
-            "candidate_name": session.candidate_name,
-            "session_duration_minutes": duration,
-            "phase": session.phase,
-            "total_events": len(events),
-            "event_categories": event_summary,
-            "sql_queries": sql_queries,
-            "ai_interactions_count": len(ai_interactions),
-            "interview_qa": interview_qa,
-            "problem_id": session.problem_id,
-            "advanced_metrics": advanced_metrics  # New!
-        }
-    
-    async def _generate_insights(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Use AI to generate deep insights from advanced metrics"""
-        
-        if not self.ai_engine:
-            return self._generate_fallback_insights(context)
-        
-        # Extract advanced metrics
-        metrics = context.get('advanced_metrics', {})
-        
-        system_prompt = """You are an Expert Technical Interview Analyst AI (V2.0).
+            for name in STAGE_COUNT
+        },
+        "counters": dict(ANALYSIS_COUNTERS),
+    }
+
+
+# Event taxonomy lookups, built once at import
+_TYPE_TO_CATEGORY = {
+    event_type: category
+    for category, event_types in EVENT_CATEGORIES.items()
+    for event_type in event_types
+}
+_INTERVIEW_TYPES = frozenset({"INTERVIEW_QUESTION", "INTERVIEW_ANSWER"})
+
+# Fallback dimension scores: (dimension, source metric), with the 0-100 scale divisor
+_DIMENSION_SOURCES = (
+    ("problem_understanding", "exploration"),
+    ("analytical_thinking", "iteration"),
+    ("debugging_ability", "debugging"),
+    ("ai_collaboration_quality", "ai_collaboration"),
+    ("sql_complexity", "sql_complexity"),
+    ("independence", "independence"),
+)
+_DIMENSION_SCALES = np.array([1.0, 1.0, 1.0, 1.0, 4.0, 1.0])
+
+# Prompt size bounds: samples of SQL runs / interview Q&A and per-text length
+MAX_SQL_EXAMPLES = 3
+MAX_INTERVIEW_QA = 10
+MAX_PROMPT_TEXT_CHARS = 2000
+
+_JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _to_json(value: Any, indent: bool = True) -> str:
+    """Serialize prompt payloads with orjson (sorted keys, optional 2-space indent)"""
+    option = _JSON_OPTIONS | orjson.OPT_SORT_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(value, option=option).decode()
+
+
+_MetricFields = namedtuple("_MetricFields", "value confidence sample_size interpretation")
+
+
+def _load_metric(metric: Dict[str, Any], default_value: float = 0.0) -> _MetricFields:
+    """Bind a metric dict's fields once, with the defaults used for missing metrics"""
+    return _MetricFields(
+        metric.get('value', default_value),
+        metric.get('confidence', 0.0),
+        metric.get('sample_size', 0),
+        metric.get('interpretation', 'unknown')
+    )
+
+
+def _clip_text(text: Any) -> Any:
+    """Truncate prompt text to MAX_PROMPT_TEXT_CHARS (non-strings pass through)"""
+    if isinstance(text, str) and len(text) > MAX_PROMPT_TEXT_CHARS:
+        return text[:MAX_PROMPT_TEXT_CHARS]
+    return text
+
+
+# ============================================================================
+# PROMPTS
+# ============================================================================
+
+SYSTEM_PROMPT = """You are an Expert Technical Interview Analyst AI (V2.0).
 
 You analyze confidence-weighted behavioral metrics from an AI-assisted data interview.
 
@@ -283,38 +227,17 @@ OUTPUT STRUCTURE:
 - ACKNOWLEDGE when data is insufficient
 - Use plain language (no event names, no formulas)"""
 
-        user_message = f"""Analyze this interview session using advanced confidence-weighted metrics:
-
-=== SESSION CONTEXT ===
-Candidate: {context['candidate_name']}
-Duration: {context.get('session_duration_minutes', 'N/A')} minutes
-Phase: {context['phase']}
-Problem Difficulty: {metrics.get('problem_difficulty', 1.0)}x (1.0 = medium)
-
-=== ADVANCED BEHAVIORAL METRICS ===
-{json.dumps(metrics, indent=2)}
-
-=== SQL ACTIVITY ===
-Total Queries: {len(context.get('sql_queries', []))}
-Query Examples (first 3):
-{json.dumps(context.get('sql_queries', [])[:3], indent=2)}
-
-=== AI INTERACTION ANALYSIS ===
-Total Interactions: {context.get('ai_interactions_count', 0)}
-Intent Classification: {json.dumps(metrics.get('ai_intent_breakdown', {}), indent=2)}
-
-=== THINKING SEQUENCES DETECTED ===
-{json.dumps(metrics.get('thinking_sequences', []), indent=2)}
+# Static instructions first so the prompt prefix is byte-identical across
+# sessions (provider prompt caching); all session values go in the tail.
+USER_PROMPT_TEMPLATE = """Analyze this interview session using advanced confidence-weighted metrics.
 
-=== OVERALL CONFIDENCE ===
-Analysis Confidence: {metrics.get('overall_confidence', 0.0):.2f} / 1.0
-(Based on sample sizes across all metrics)
-
-=== INTERVIEW ENGAGEMENT ===
-Q&A Exchanges: {len(context.get('interview_qa', []))}
+The session data follows at the end of this message, in these sections:
+SESSION CONTEXT, ADVANCED BEHAVIORAL METRICS, SQL ACTIVITY, AI INTERACTION ANALYSIS,
+THINKING SEQUENCES DETECTED, OVERALL CONFIDENCE, INTERVIEW ENGAGEMENT.
 
-Interview Responses (evaluate quality):
-{json.dumps(context.get('interview_qa', [])[:10], indent=2)}
+Long query and answer texts are truncated to {max_text_chars} characters.
+Problem Difficulty is a multiplier (1.0 = medium). Analysis Confidence is 0.0-1.0,
+based on sample sizes across all metrics.
 
 CRITICAL: Analyze interview responses for:
 - Coherence and relevance (vs gibberish/random text)
@@ -334,9 +257,8 @@ Red flags in responses:
 
 Generate comprehensive recruiter-friendly analysis with confidence-weighted insights.
 
-Return both:
-1. Narrative analysis (following structure in system prompt)
-2. JSON summary:
+Respond with ONLY this JSON object (no text outside it). Put the full narrative
+analysis, following the structure in the system prompt, in "detailed_narrative":
 
 {{
   "overall_score": <0-100>,
@@ -368,23 +290,407 @@ Return both:
     "Sample size limitations...",
     "Missing data points..."
   ]
-}}"""
+}}
+
+⸻
+
+=== SESSION CONTEXT ===
+Candidate: {candidate_name}
+Duration: {duration} minutes
+Phase: {phase}
+Problem Difficulty: {problem_difficulty}x
+
+=== ADVANCED BEHAVIORAL METRICS ===
+{metrics_json}
+
+=== SQL ACTIVITY ===
+Total Queries: {total_queries}
+Query Examples (first {max_sql_examples}):
+{sql_examples_json}
+
+=== AI INTERACTION ANALYSIS ===
+Total Interactions: {ai_interactions_count}
+Intent Classification: {intent_json}
+
+=== THINKING SEQUENCES DETECTED ===
+{sequences_json}
+
+=== OVERALL CONFIDENCE ===
+Analysis Confidence: {overall_confidence:.2f} / 1.0
+
+=== INTERVIEW ENGAGEMENT ===
+Q&A Exchanges: {qa_count}
+
+Interview Responses (first {max_interview_qa}, evaluate quality):
+{interview_json}"""
+
+FALLBACK_NARRATIVE_TEMPLATE = """**Metrics-Based Analysis (AI unavailable)**
+
+**Candidate Summary:**
+Behavioral Profile: {profile}
+Overall Confidence: {overall_confidence:.2f} / 1.0
+
+**Problem-Solving Approach:**
+• Exploration: {exploration_interp} (score: {exploration_value:.2f}, confidence: {exploration_conf:.2f})
+• Iteration: {iteration_interp} (score: {iteration_value:.2f}, confidence: {iteration_conf:.2f})
+
+**Technical Capability:**
+• SQL Complexity: {sql_interp} (score: {sql_value:.2f}, confidence: {sql_conf:.2f})
+• Debugging: {debugging_interp} (score: {debugging_value:.2f}, confidence: {debugging_conf:.2f})
+
+**AI Usage:**
+• Profile: {profile}
+• Reliance: {reliance_value:.2f} ({reliance_interp})
+• Collaboration Quality: {collab_value:.2f} ({collab_interp})
+• Intent Breakdown: {intent_json}
+
+**Thinking Sequences Detected:**
+{sequences_json}
+
+**Data Quality:**
+{data_quality}
+
+**Recommendation:**
+{recommendation} (confidence: {rec_confidence:.2f})
+"""
+
+
+class _RowView:
+    """
+    Read-only mapping view over a snapshot of an ORM row's columns, keyed
+    the way AdvancedMetricsCalculator reads its input dicts (get / [])
+    
+    The values are copied when the view is built, on the event loop thread,
+    so the metrics worker thread never touches the ORM instance or its session.
+    """
+    __slots__ = ("_values",)
+    _FIELDS: Dict[str, str] = {}
+    _INDEX: Dict[str, int] = {}
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._INDEX = {key: i for i, key in enumerate(cls._FIELDS)}
+    
+    def __init__(self, row):
+        self._values = tuple(getattr(row, attr) for attr in self._FIELDS.values())
+    
+    def __getitem__(self, key: str) -> Any:
+        return self._values[self._INDEX[key]]
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        index = self._INDEX.get(key)
+        return default if index is None else self._values[index]
+
+
+class _EventView(_RowView):
+    """Event row as {"type", "timestamp", "metadata"}"""
+    __slots__ = ()
+    _FIELDS = {"type": "event_type", "timestamp": "timestamp", "metadata": "event_metadata"}
+    
+    def __getitem__(self, key: str) -> Any:
+        value = super().__getitem__(key)
+        return {} if value is None and key == "metadata" else value
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        value = super().get(key, default)
+        return {} if value is None and key == "metadata" else value
+
 
+class _AIInteractionView(_RowView):
+    """AI interaction row as {"user_prompt", "intent_label", "response_used", "timestamp"}"""
+    __slots__ = ()
+    _FIELDS = {
+        "user_prompt": "user_prompt",
+        "intent_label": "intent_label",
+        "response_used": "response_used",
+        "timestamp": "timestamp",
+    }
+
+
+class BehaviorAnalyzer:
+    """Analyzes candidate events and generates recruiter insights using AI"""
+    
+    # Max number of raw LLM responses kept for repeat analyses
+    INSIGHTS_CACHE_SIZE = 128
+    
+    def __init__(self):
+        self.ai_engine = None
+        self._insights_cache: "OrderedDict[str, str]" = OrderedDict()
         try:
-            response = await self.ai_engine.generate(system_prompt, user_message)
+            self.ai_engine = get_ai_engine()
+        except Exception as e:
+            logger.warning(f"AI engine not initialized for BehaviorAnalyzer: {e}")
+        self.refresh_model()
+    
+    def refresh_model(self) -> Optional[str]:
+        """Re-read the engine's active model name (call after swapping models)
+        
+        The name is read once here rather than per analysis. Per-call failover
+        in the engine does not change its active model; only replacing the
+        engine's models does, and that is when this must be called.
+        """
+        self._active_model = self.ai_engine.get_active_model_name() if self.ai_engine else None
+        return self._active_model
+    
+    async def analyze_session(
+        self, 
+        session_id: str, 
+        db: Session
+    ) -> Dict[str, Any]:
+        """
+        Analyze complete interview session and generate insights
+        
+        Args:
+            session_id: Session to analyze
+            db: Database session
+        
+        Returns:
+            Comprehensive analysis with scores, insights, and recommendations
+        """
+        # Fetch session with its events and AI interactions eagerly loaded
+        # (relationships are ordered by sequence_number / timestamp). Only the
+        # AI interaction columns the analysis reads are selected; response
+        # text and context JSON stay in the database.
+        with _stage("db_fetch"):
+            session = db.query(SessionModel).options(
+                selectinload(SessionModel.events),
+                selectinload(SessionModel.ai_interactions).load_only(
+                    AIInteraction.user_prompt,
+                    AIInteraction.intent_label,
+                    AIInteraction.response_used,
+                    AIInteraction.timestamp
+                )
+            ).filter(SessionModel.session_id == session_id).first()
+        if not session:
+            return {"error": "Session not found"}
+        
+        events = session.events
+        ai_interactions = session.ai_interactions
+        ANALYSIS_COUNTERS["sessions_analyzed"] += 1
+        ANALYSIS_COUNTERS["events_processed"] += len(events)
+        ANALYSIS_COUNTERS["ai_interactions_processed"] += len(ai_interactions)
+        
+        # Build analysis context
+        with _stage("build_context"):
+            analysis_context = await self._build_analysis_context(
+                session, events, ai_interactions
+            )
+        
+        # Generate AI insights
+        insights = await self._generate_insights(analysis_context)
+        
+        return insights
+    
+    async def analyze_sessions(
+        self,
+        session_ids: List[str],
+        db_factory: Callable[[], ContextManager[Session]],
+        max_concurrency: int = 8
+    ) -> List[Any]:
+        """
+        Analyze several sessions concurrently, bounded by a semaphore
+        
+        Args:
+            session_ids: Sessions to analyze
+            db_factory: Context manager yielding a database session (e.g. get_db_session)
+            max_concurrency: Maximum number of analyses (LLM calls) in flight
+        
+        Returns:
+            One result per session id, in order; failures are returned as exceptions
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def _analyze_one(session_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                with db_factory() as db:
+                    return await self.analyze_session(session_id, db)
+        
+        return await asyncio.gather(
+            *(_analyze_one(session_id) for session_id in session_ids),
+            return_exceptions=True
+        )
+    
+    async def _build_analysis_context(
+        self,
+        session: SessionModel,
+        events: List[Event],
+        ai_interactions: List[AIInteraction]
+    ) -> Dict[str, Any]:
+        """
+        Build structured context for AI analysis with advanced metrics
+        
+        The CPU-bound metrics calculation runs in a worker thread so it does
+        not stall other analyses and LLM calls on the event loop.
+        """
+        
+        # Calculator input: lightweight dict-style snapshots of the ORM rows,
+        # taken here so the worker thread below only sees plain values
+        event_data = [_EventView(e) for e in events]
+        ai_data = [_AIInteractionView(ai) for ai in ai_interactions]
+        
+        # Single pass over events: category counts, SQL queries and interview Q&A.
+        # Only the samples shown to the LLM are kept; totals are counted in full.
+        include_interview = session.phase in ("interview", "completed")
+        event_category_counts = dict.fromkeys(EVENT_CATEGORIES, 0)
+        sql_queries = []
+        interview_qa = []
+        total_sql_queries = 0
+        total_interview_qa = 0
+        for e in events:
+            event_type = e.event_type
+            metadata = e.event_metadata
+            
+            # Count events per category for context
+            category = _TYPE_TO_CATEGORY.get(event_type)
+            if category is not None:
+                event_category_counts[category] += 1
+            
+            # Extract SQL query samples with full context
+            if event_type == "SQL_RUN":
+                if metadata:
+                    total_sql_queries += 1
+                    if len(sql_queries) < MAX_SQL_EXAMPLES:
+                        sql_queries.append({
+                            "query": _clip_text(metadata.get("query", "")),
+                            "result": metadata.get("result"),
+                            "error": metadata.get("error"),
+                            "timestamp": e.timestamp.isoformat() if e.timestamp else None
+                        })
+            # Interview phase data
+            elif include_interview and event_type in _INTERVIEW_TYPES:
+                total_interview_qa += 1
+                if len(interview_qa) < MAX_INTERVIEW_QA:
+                    interview_qa.append({
+                        "type": event_type,
+                        "content": _clip_text(metadata.get("question") or metadata.get("answer", "")),
+                        "timestamp": e.timestamp.isoformat() if e.timestamp else None
+                    })
+        
+        # Problem difficulty is not stored with problems yet; use medium
+        problem_difficulty = 1.0
+        
+        # Calculate advanced metrics off the event loop
+        with _stage("metrics_calc"):
+            advanced_metrics = await asyncio.to_thread(
+                self._calculate_advanced_metrics, event_data, ai_data, problem_difficulty
+            )
+        
+        # Calculate session metrics
+        duration = None
+        if session.end_time:
+            duration = (session.end_time - session.start_time).total_seconds() / 60
+        
+        return {
+            "candidate_name": session.candidate_name,
+            "session_duration_minutes": duration,
+            "phase": session.phase,
+            "total_events": len(events),
+            "event_category_counts": event_category_counts,
+            "sql_queries": sql_queries,
+            "total_sql_queries": total_sql_queries,
+            "ai_interactions_count": len(ai_interactions),
+            "interview_qa": interview_qa,
+            "total_interview_qa": total_interview_qa,
+            "problem_id": session.problem_id,
+            "advanced_metrics": advanced_metrics  # New!
+        }
+    
+    @staticmethod
+    def _calculate_advanced_metrics(
+        event_data: List[Dict[str, Any]],
+        ai_data: List[Dict[str, Any]],
+        problem_difficulty: float
+    ) -> Dict[str, Any]:
+        """Run the advanced metrics calculator (synchronous, CPU-bound)"""
+        calculator = AdvancedMetricsCalculator(
+            events=event_data,
+            ai_interactions=ai_data,
+            problem_difficulty=problem_difficulty
+        )
+        return calculator.calculate_all_metrics()
+    
+    async def _generate_insights(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Use AI to generate deep insights from advanced metrics"""
+        
+        if not self.ai_engine:
+            return self._generate_fallback_insights(context)
+        
+        # Extract advanced metrics and serialize each prompt payload once
+        metrics = context.get('advanced_metrics', {})
+        metrics_json = _to_json(metrics, indent=False)
+        sql_examples_json = _to_json(context.get('sql_queries', []))
+        intent_json = _to_json(metrics.get('ai_intent_breakdown', {}))
+        sequences_json = _to_json(metrics.get('thinking_sequences', []))
+        interview_json = _to_json(context.get('interview_qa', []))
+        
+        user_message = USER_PROMPT_TEMPLATE.format_map({
+            "candidate_name": context['candidate_name'],
+            "duration": context.get('session_duration_minutes', 'N/A'),
+            "phase": context['phase'],
+            "problem_difficulty": metrics.get('problem_difficulty', 1.0),
+            "metrics_json": metrics_json,
+            "total_queries": context.get('total_sql_queries', 0),
+            "sql_examples_json": sql_examples_json,
+            "ai_interactions_count": context.get('ai_interactions_count', 0),
+            "intent_json": intent_json,
+            "sequences_json": sequences_json,
+            "overall_confidence": metrics.get('overall_confidence', 0.0),
+            "qa_count": context.get('total_interview_qa', 0),
+            "interview_json": interview_json,
+            "max_sql_examples": MAX_SQL_EXAMPLES,
+            "max_interview_qa": MAX_INTERVIEW_QA,
+            "max_text_chars": MAX_PROMPT_TEXT_CHARS,
+        })
+
+        try:
+            cache_key = self._insights_cache_key(SYSTEM_PROMPT, user_message)
+            response = self._insights_cache.get(cache_key)
+            if response is not None:
+                self._insights_cache.move_to_end(cache_key)
+                ANALYSIS_COUNTERS["llm_cache_hits"] += 1
+                logger.info("♻️  Reusing cached insights response")
+            else:
+                ANALYSIS_COUNTERS["llm_cache_misses"] += 1
+                with _stage("llm_call"):
+                    # The insights cache above is the only cache for these
+                    # replies (it keeps parseable ones only)
+                    response = await self.ai_engine.generate(
+                        SYSTEM_PROMPT, user_message, json_mode=True, use_cache=False
+                    )
+                # Engines do not report token usage; track prompt/response size
+                ANALYSIS_COUNTERS["llm_prompt_chars"] += len(SYSTEM_PROMPT) + len(user_message)
+                ANALYSIS_COUNTERS["llm_response_chars"] += len(response)
             
             # Parse JSON response
-            insights = json.loads(response)
+            with _stage("json_parse"):
+                insights = orjson.loads(response)
+            self._remember_insights(cache_key, response)
             insights["generated_at"] = datetime.utcnow().isoformat()
-            insights["ai_model"] = self.ai_engine.get_active_model_name()
+            insights["ai_model"] = self._active_model
             insights["advanced_metrics"] = metrics
             
             return insights
         
         except Exception as e:
             logger.error(f"AI insight generation failed: {e}")
+            ANALYSIS_COUNTERS["llm_fallbacks"] += 1
             return self._generate_fallback_insights(context)
     
+    def _insights_cache_key(self, system_prompt: str, user_message: str) -> str:
+        """Hash the full prompt, prefixed with the active model so a model switch misses"""
+        digest = hashlib.sha256()
+        for part in (self._active_model or "", system_prompt, user_message):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def _remember_insights(self, cache_key: str, response: str):
+        """Store a parseable LLM response, evicting the least recently used entry"""
+        self._insights_cache[cache_key] = response
+        self._insights_cache.move_to_end(cache_key)
+        if len(self._insights_cache) > self.INSIGHTS_CACHE_SIZE:
+            self._insights_cache.popitem(last=False)
+    
     def _generate_fallback_insights(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """Generate metrics-based insights without AI using advanced metrics"""
         
@@ -403,104 +709,92 @@ Return both:
                 "ai_model": "Fallback (No Data)"
             }
         
-        # Extract metric values with confidence
-        exploration = metrics.get('exploration', {})
-        iteration = metrics.get('iteration', {})
-        debugging = metrics.get('debugging', {})
-        ai_reliance = metrics.get('ai_reliance', {})
-        ai_collab = metrics.get('ai_collaboration', {})
-        sql_complexity = metrics.get('sql_complexity', {})
-        independence = metrics.get('independence', {})
-        
-        # Calculate dimension scores (0-100) with confidence
-        def to_score_with_confidence(metric_dict: Dict, scale: float = 1.0) -> Dict:
-            value = metric_dict.get('value', 0.0)
-            confidence = metric_dict.get('confidence', 0.0)
-            score = min(100, max(0, int(value * 100 / scale)))
-            return {"score": score, "confidence": round(confidence, 2)}
+        # Bind each metric's fields once
+        exploration = _load_metric(metrics.get('exploration', {}))
+        iteration = _load_metric(metrics.get('iteration', {}))
+        debugging = _load_metric(metrics.get('debugging', {}))
+        ai_reliance = _load_metric(metrics.get('ai_reliance', {}), default_value=0.5)
+        ai_collab = _load_metric(metrics.get('ai_collaboration', {}), default_value=0.5)
+        sql_complexity = _load_metric(metrics.get('sql_complexity', {}))
+        
+        # Calculate dimension scores (0-100) with confidence, vectorized over dimensions
+        source_metrics = [metrics.get(source, {}) for _, source in _DIMENSION_SOURCES]
+        values = np.array([m.get('value', 0.0) for m in source_metrics], dtype=np.float64)
+        confidences = [round(m.get('confidence', 0.0), 2) for m in source_metrics]
+        weights = np.array(confidences, dtype=np.float64)
+        scores = np.clip(np.trunc(values * 100 / _DIMENSION_SCALES), 0, 100)
         
         dimension_scores = {
-            "problem_understanding": to_score_with_confidence(exploration, 1.0),
-            "analytical_thinking": to_score_with_confidence(iteration, 1.0),
-            "debugging_ability": to_score_with_confidence(debugging, 1.0),
-            "ai_collaboration_quality": to_score_with_confidence(ai_collab, 1.0),
-            "sql_complexity": to_score_with_confidence(sql_complexity, 4.0),
-            "independence": to_score_with_confidence(independence, 1.0)
+            dim: {"score": score, "confidence": confidence}
+            for (dim, _), score, confidence in zip(
+                _DIMENSION_SOURCES, scores.astype(np.int64).tolist(), confidences
+            )
         }
         
         # Calculate overall score weighted by confidence
-        total_score = 0
-        total_weight = 0
-        for dim, score_data in dimension_scores.items():
-            weight = score_data['confidence']
-            total_score += score_data['score'] * weight
-            total_weight += weight
-        
-        overall_score = int(total_score / total_weight) if total_weight > 0 else 50
+        total_weight = weights.sum()
+        overall_score = int((scores * weights).sum() / total_weight) if total_weight > 0 else 50
         overall_confidence = metrics.get('overall_confidence', 0.0)
         
         # Determine behavioral profile
-        ai_rel_value = ai_reliance.get('value', 0.5)
-        ai_col_value = ai_collab.get('value', 0.5)
-        
-        if ai_rel_value < 0.3:
+        if ai_reliance.value < 0.3:
             profile = "Independent Thinker"
-        elif ai_rel_value < 0.6 and ai_col_value > 0.4:
+        elif ai_reliance.value < 0.6 and ai_collab.value > 0.4:
             profile = "Healthy AI Collaborator"
         else:
             profile = "AI Dependent"
         
         # Generate strengths (high confidence only)
         strengths = []
-        if exploration.get('confidence', 0) > 0.5 and exploration.get('value', 0) > 0.4:
+        if exploration.confidence > 0.5 and exploration.value > 0.4:
             strengths.append({
-                "strength": f"Strong data exploration approach ({exploration.get('interpretation')})",
-                "confidence": exploration.get('confidence'),
-                "evidence": f"ExplorationScore: {exploration.get('value'):.2f}, {exploration.get('sample_size')} observations"
+                "strength": f"Strong data exploration approach ({exploration.interpretation})",
+                "confidence": exploration.confidence,
+                "evidence": f"ExplorationScore: {exploration.value:.2f}, {exploration.sample_size} observations"
             })
         
-        if iteration.get('confidence', 0) > 0.5 and iteration.get('value', 0) > 0.35:
+        if iteration.confidence > 0.5 and iteration.value > 0.35:
             strengths.append({
-                "strength": f"Iterative problem solver ({iteration.get('interpretation')})",
-                "confidence": iteration.get('confidence'),
-                "evidence": f"IterationScore: {iteration.get('value'):.2f}, {iteration.get('sample_size')} meaningful iterations"
+                "strength": f"Iterative problem solver ({iteration.interpretation})",
+                "confidence": iteration.confidence,
+                "evidence": f"IterationScore: {iteration.value:.2f}, {iteration.sample_size} meaningful iterations"
             })
         
-        if debugging.get('confidence', 0) > 0.5 and debugging.get('value', 0) > 0.65:
+        if debugging.confidence > 0.5 and debugging.value > 0.65:
             strengths.append({
-                "strength": f"Effective debugging ({debugging.get('interpretation')})",
-                "confidence": debugging.get('confidence'),
-                "evidence": f"DebugScore: {debugging.get('value'):.2f}, {debugging.get('sample_size')} error encounters"
+                "strength": f"Effective debugging ({debugging.interpretation})",
+                "confidence": debugging.confidence,
+                "evidence": f"DebugScore: {debugging.value:.2f}, {debugging.sample_size} error encounters"
             })
         
-        if sql_complexity.get('value', 0) > 2.5:
+        if sql_complexity.value > 2.5:
             strengths.append({
-                "strength": f"Advanced SQL capability ({sql_complexity.get('interpretation')})",
-                "confidence": sql_complexity.get('confidence'),
-                "evidence": f"SQL Complexity: {sql_complexity.get('value'):.2f}, {sql_complexity.get('sample_size')} queries analyzed"
+                "strength": f"Advanced SQL capability ({sql_complexity.interpretation})",
+                "confidence": sql_complexity.confidence,
+                "evidence": f"SQL Complexity: {sql_complexity.value:.2f}, {sql_complexity.sample_size} queries analyzed"
             })
         
         # Generate concerns
         concerns = []
-        if ai_reliance.get('confidence', 0) > 0.5 and ai_rel_value > 0.6:
+        if ai_reliance.confidence > 0.5 and ai_reliance.value > 0.6:
             concerns.append({
-                "concern": f"High AI dependency ({ai_reliance.get('interpretation')})",
-                "confidence": ai_reliance.get('confidence'),
-                "evidence": f"AI Reliance: {ai_rel_value:.2f}, {ai_reliance.get('sample_size')} AI interactions"
+                "concern": f"High AI dependency ({ai_reliance.interpretation})",
+                "confidence": ai_reliance.confidence,
+                "evidence": f"AI Reliance: {ai_reliance.value:.2f}, {ai_reliance.sample_size} AI interactions"
             })
         
-        if exploration.get('confidence', 0) > 0.5 and exploration.get('value', 0) < 0.15:
+        if exploration.confidence > 0.5 and exploration.value < 0.15:
             concerns.append({
-                "concern": f"Limited data exploration ({exploration.get('interpretation')})",
-                "confidence": exploration.get('confidence'),
-                "evidence": f"ExplorationScore: {exploration.get('value'):.2f}"
+                "concern": f"Limited data exploration ({exploration.interpretation})",
+                "confidence": exploration.confidence,
+                "evidence": f"ExplorationScore: {exploration.value:.2f}"
             })
         
-        if debugging.get('confidence', 0) > 0.5 and debugging.get('value', 0) < 0.35:
+        if debugging.confidence > 0.5 and debugging.value < 0.35:
             concerns.append({
-                "concern": f"Struggles with debugging ({debugging.get('interpretation')})",
-                "confidence": debugging.get('confidence'),
-                "evidence": f"DebugScore: {debugging.get('value'):.2f}"
+                "concern": f"Struggles with debugging ({debugging.interpretation})",
+                "confidence": debugging.confidence,
+                "evidence": f"DebugScore: {debugging.value:.2f}"
             })
         
         # Check for low confidence issues
@@ -538,35 +832,34 @@ Return both:
             rec_confidence = overall_confidence
         
         # Generate narrative
-        narrative = f"""**Metrics-Based Analysis (AI unavailable)**
-
-**Candidate Summary:**
-Behavioral Profile: {profile}
-Overall Confidence: {overall_confidence:.2f} / 1.0
-
-**Problem-Solving Approach:**
-• Exploration: {exploration.get('interpretation', 'unknown')} (score: {exploration.get('value', 0):.2f}, confidence: {exploration.get('confidence', 0):.2f})
-• Iteration: {iteration.get('interpretation', 'unknown')} (score: {iteration.get('value', 0):.2f}, confidence: {iteration.get('confidence', 0):.2f})
-
-**Technical Capability:**
-• SQL Complexity: {sql_complexity.get('interpretation', 'unknown')} (score: {sql_complexity.get('value', 0):.2f}, confidence: {sql_complexity.get('confidence', 0):.2f})
-• Debugging: {debugging.get('interpretation', 'unknown')} (score: {debugging.get('value', 0):.2f}, confidence: {debugging.get('confidence', 0):.2f})
-
-**AI Usage:**
-• Profile: {profile}
-• Reliance: {ai_reliance.get('value', 0):.2f} ({ai_reliance.get('interpretation', 'unknown')})
-• Collaboration Quality: {ai_collab.get('value', 0):.2f} ({ai_collab.get('interpretation', 'unknown')})
-• Intent Breakdown: {json.dumps(metrics.get('ai_intent_breakdown', {}), indent=2)}
-
-**Thinking Sequences Detected:**
-{json.dumps(metrics.get('thinking_sequences', []), indent=2)}
-
-**Data Quality:**
-{chr(10).join('• ' + note for note in data_quality_notes) if data_quality_notes else '• Sufficient data for analysis'}
-
-**Recommendation:**
-{recommendation.upper()} (confidence: {rec_confidence:.2f})
-"""
+        narrative = FALLBACK_NARRATIVE_TEMPLATE.format_map({
+            "profile": profile,
+            "overall_confidence": overall_confidence,
+            "exploration_interp": exploration.interpretation,
+            "exploration_value": exploration.value,
+            "exploration_conf": exploration.confidence,
+            "iteration_interp": iteration.interpretation,
+            "iteration_value": iteration.value,
+            "iteration_conf": iteration.confidence,
+            "sql_interp": sql_complexity.interpretation,
+            "sql_value": sql_complexity.value,
+            "sql_conf": sql_complexity.confidence,
+            "debugging_interp": debugging.interpretation,
+            "debugging_value": debugging.value,
+            "debugging_conf": debugging.confidence,
+            "reliance_value": ai_reliance.value,
+            "reliance_interp": ai_reliance.interpretation,
+            "collab_value": ai_collab.value,
+            "collab_interp": ai_collab.interpretation,
+            "intent_json": _to_json(metrics.get('ai_intent_breakdown', {})),
+            "sequences_json": _to_json(metrics.get('thinking_sequences', [])),
+            "data_quality": (
+                '\n'.join('• ' + note for note in data_quality_notes)
+                if data_quality_notes else '• Sufficient data for analysis'
+            ),
+            "recommendation": recommendation.upper(),
+            "rec_confidence": rec_confidence,
+        })
         
         return {
             "overall_score": overall_score,
@@ -587,11 +880,14 @@ Overall Confidence: {overall_confidence:.2f} / 1.0
 
 # Global analyzer instance
 _analyzer: Optional[BehaviorAnalyzer] = None
+_analyzer_lock = threading.Lock()
 
 
 def get_analyzer() -> BehaviorAnalyzer:
-    """Get global analyzer instance"""
+    """Get global analyzer instance (created once, even under concurrent first calls)"""
     global _analyzer
     if _analyzer is None:
-        _analyzer = BehaviorAnalyzer()
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = BehaviorAnalyzer()
     return _analyzer
@@ -3,53 +3,44 @@ AI Helper - Candidate-facing AI assistant with coding and interview modes.
 Uses LangChain with Gemini for intelligent, context-aware responses.
 """
 
-from typing import Dict, Any, Optional, List
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+import string
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, List, Tuple, Deque, AsyncIterator
 from langchain_config import get_ai_engine
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class AIHelper:
-    """AI Assistant helper using Gemini via LangChain"""
-    
-    def __init__(self):
-        self.ai_engine = None
-        try:
-            self.ai_engine = get_ai_engine()
-        except Exception as e:
-            logger.warning(f"AI engine not initialized for AIHelper: {e}")
-        
-        self.conversation_history: Dict[str, List[Dict[str, str]]] = {}
-    
-    def _get_coding_system_prompt(self, schema_info: Optional[Dict] = None, problem_context: Optional[Dict] = None) -> str:
-        """System prompt for coding assistance mode"""
-        schema_text = ""
-        if schema_info:
-            schema_text = f"\n\nAvailable Tables:\n{schema_info}"
-        
-        problem_text = ""
-        if problem_context:
-            problem_text = "\n\nProblem Context:"
-            if problem_context.get('title'):
-                problem_text += f"\nTitle: {problem_context['title']}"
-            if problem_context.get('description'):
-                problem_text += f"\nDescription: {problem_context['description']}"
-            if problem_context.get('tables'):
-                problem_text += "\n\nTables Available:"
-                for table in problem_context['tables']:
-                    problem_text += f"\n- {table['name']} ({table.get('row_count', '?')} rows)"
-                    if table.get('schema'):
-                        # Schema might be dict or list
-                        if isinstance(table['schema'], dict):
-                            columns = ', '.join(table['schema'].keys())
-                        elif isinstance(table['schema'], list):
-                            columns = ', '.join([str(c) for c in table['schema']])
-                        else:
-                            columns = str(table['schema'])
-                        problem_text += f"\n  Columns: {columns}"
-        
-        return f"""You are an AI assistant helping a candidate in a SQL coding interview.{schema_text}{problem_text}
+# Engine shared by every AIHelper instance, resolved on first use
+_ENGINE = None
+
+
+def _engine():
+    """Shared AI engine (raises if init_ai_engine() has not run yet)"""
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = get_ai_engine()
+    return _ENGINE
+
+
+def _context_digest(*parts: Any) -> str:
+    """Stable short digest of JSON-like prompt inputs (schema / problem context)"""
+    payload = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+# Static system prompts: identical bytes on every call so providers can cache
+# the prefix. Per-problem context travels at the start of the user message.
+CODING_SYSTEM_PROMPT = """You are an AI assistant helping a candidate in a SQL coding interview.
+The problem context and available tables are given at the start of the candidate's message.
 
 IMPORTANT RULES:
 1. You can EXPLAIN SQL concepts and syntax
@@ -76,21 +67,9 @@ Example Bad Response:
 "Here's the query: SELECT customer_id, COUNT(*) as orders FROM orders GROUP BY customer_id ORDER BY orders DESC LIMIT 5"
 
 Remember: This evaluates how they collaborate with AI, not their ability to copy code."""
-    
-    def _get_interview_system_prompt(self, problem_context: Optional[Dict] = None) -> str:
-        """System prompt for interview mode"""
-        problem_text = ""
-        if problem_context:
-            problem_text = "\n\nProblem Context:"
-            if problem_context.get('title'):
-                problem_text += f"\nProblem: {problem_context['title']}"
-            if problem_context.get('description'):
-                problem_text += f"\nDescription: {problem_context['description']}"
-            if problem_context.get('tables'):
-                tables_list = ', '.join([t['name'] for t in problem_context['tables']])
-                problem_text += f"\nTables Used: {tables_list}"
-        
-        return f"""You are an AI interviewer conducting a post-coding interview for a data analyst role.{problem_text}
+
+INTERVIEW_SYSTEM_PROMPT = """You are an AI interviewer conducting a post-coding interview for a data analyst role.
+The problem context is given at the start of the message.
 
 Your task: Ask ONE SHORT follow-up question about their SQL approach and problem-solving.
 
@@ -120,6 +99,223 @@ Example BAD questions:
 - "Explain in detail every decision you made in your query structure." (TOO VAGUE, TOO DEMANDING)
 
 Remember: ONE short, specific question. No follow-ups. No multi-part questions."""
+
+# Fallback replies returned in place of a model response
+UNAVAILABLE_RESPONSE = "AI service temporarily unavailable. Please try again."
+ERROR_RESPONSE = "I encountered an error processing your request. Please try rephrasing your question."
+
+
+# Intent keywords in priority order: the first intent with any keyword in the
+# prompt wins; prompts matching none are EXPLANATION
+INTENT_TABLE: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("CONCEPT_HELP", ("what is", "explain", "define", "how does", "concept")),
+    ("DEBUG_HELP", ("error", "bug", "debug", "fix", "wrong", "not working")),
+    ("APPROACH_HELP", ("approach", "strategy", "how to", "method", "technique")),
+    ("VALIDATION", ("check", "validate", "correct", "verify", "review")),
+    ("DIRECT_SOLUTION", ("solve", "solution", "answer", "complete", "finish")),
+)
+_INTENT_PRIORITY = {intent: rank for rank, (intent, _) in enumerate(INTENT_TABLE)}
+
+# All intent keywords as one zero-width scan: every start position is visited
+# and the highest-priority keyword starting there is reported, so a
+# lower-priority keyword earlier in the prompt cannot hide a later one
+_INTENT_RE = re.compile('(?=' + '|'.join(
+    f"(?P<{intent}>{'|'.join(map(re.escape, keywords))})"
+    for intent, keywords in INTENT_TABLE
+) + ')')
+
+
+class AIHelper:
+    """AI Assistant helper using Gemini via LangChain"""
+    
+    # Max number of rendered context blocks kept (one per mode/problem/schema)
+    CONTEXT_CACHE_SIZE = 256
+    
+    # Interview questions from concurrent candidates are coalesced into one
+    # engine batch: at most this many, collected for at most this long (seconds)
+    QUESTION_BATCH_SIZE = 16
+    QUESTION_BATCH_WINDOW = 0.05
+    
+    # Messages kept per session (last 10 exchanges); older ones fall off the ring
+    HISTORY_MAX_MESSAGES = 20
+    # Once history reaches this many messages, the oldest HISTORY_SUMMARIZE_MESSAGES
+    # are compressed into one summary entry. The gap to the cap leaves room for
+    # two more exchanges while the summary is generated in the background.
+    HISTORY_SUMMARIZE_AT = 16
+    HISTORY_SUMMARIZE_MESSAGES = 10
+    HISTORY_SUMMARY_PROMPT = (
+        "Summarize this conversation between a candidate and an AI assistant in "
+        "at most 2 sentences. Keep what the candidate asked about and any hints given."
+    )
+    
+    # Sessions with history kept in memory (least recently used dropped first),
+    # and how long an idle session's history survives (seconds)
+    HISTORY_MAX_SESSIONS = int(os.getenv("SESSION_CACHE", "1000"))
+    HISTORY_TTL_SECONDS = 3600
+    
+    # Only the tail of long queries is sent (most recent edits are at the end)
+    MAX_CONTEXT_CODE_CHARS = 2000
+    
+    # Interview question focus and canned fallbacks, indexed by question number
+    _FOCUS_AREAS = (
+        "their overall approach and strategy",
+        "a specific SQL technique or JOIN they used",
+        "how they would handle edge cases or scale this",
+        "what insights or patterns they discovered",
+        "what they learned or would do differently"
+    )
+    _FALLBACK_QUESTIONS = (
+        "What was your overall approach to this problem?",
+        "Why did you choose that SQL technique?",
+        "How would this work with a larger dataset?",
+        "What patterns did you notice in the data?",
+        "What would you improve if you had more time?"
+    )
+    _QUESTION_TEMPLATE = string.Template("""${context}This is question #${number} of 5 in the interview.${problem}
+
+Candidate's Recent SQL Queries:
+${queries}
+
+Generate ONE SHORT question (1-2 sentences max) focusing on: ${focus}
+
+Do not ask multiple questions. Do not ask for detailed explanations. Keep it conversational.""")
+    
+    # Max concurrent engine calls from this helper; extra callers wait instead
+    # of piling onto the provider and failing with rate-limit errors
+    MAX_INFLIGHT = int(os.getenv("AI_MAX_INFLIGHT", "8"))
+    
+    def __init__(self):
+        self.ai_engine = None
+        try:
+            self.ai_engine = _engine()
+        except Exception as e:
+            logger.warning(f"AI engine not initialized for AIHelper: {e}")
+        
+        # Ordered by last use, so idle and excess sessions are evicted from the front
+        self.conversation_history: "OrderedDict[str, Deque[Dict[str, str]]]" = OrderedDict()
+        self._history_last_used: Dict[str, float] = {}
+        self._context_blocks: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._summarizing: set = set()
+        # Running summarization tasks, referenced until done so they aren't garbage-collected
+        self._summary_tasks: set = set()
+        self._inflight = asyncio.Semaphore(self.MAX_INFLIGHT)
+        self.inflight_calls = 0
+        
+        # Created lazily so they bind to the running event loop
+        self._question_queue: Optional[asyncio.Queue] = None
+        self._batch_worker_task: Optional[asyncio.Task] = None
+    
+    @asynccontextmanager
+    async def _engine_slot(self):
+        """Hold one of the MAX_INFLIGHT engine slots, logging when callers have to queue"""
+        if self._inflight.locked():
+            logger.warning(f"⏳ AI engine saturated ({self.inflight_calls} calls in flight), waiting for a slot")
+        async with self._inflight:
+            self.inflight_calls += 1
+            try:
+                yield
+            finally:
+                self.inflight_calls -= 1
+    
+    def _get_history(self, session_id: str, create: bool = False) -> Optional[Deque[Dict[str, str]]]:
+        """Session history (created on demand), evicting idle and least recently used sessions"""
+        now = time.monotonic()
+        
+        # Oldest use first: stop at the first session still within its TTL
+        while self.conversation_history:
+            oldest = next(iter(self.conversation_history))
+            if now - self._history_last_used[oldest] < self.HISTORY_TTL_SECONDS:
+                break
+            self.conversation_history.popitem(last=False)
+            del self._history_last_used[oldest]
+        
+        history = self.conversation_history.get(session_id)
+        if history is None:
+            if not create:
+                return None
+            # Bounded ring: keeps only the last 10 exchanges
+            history = deque(maxlen=self.HISTORY_MAX_MESSAGES)
+            self.conversation_history[session_id] = history
+        else:
+            self.conversation_history.move_to_end(session_id)
+        self._history_last_used[session_id] = now
+        
+        while len(self.conversation_history) > self.HISTORY_MAX_SESSIONS:
+            evicted, _ = self.conversation_history.popitem(last=False)
+            del self._history_last_used[evicted]
+        
+        return history
+    
+    def _get_context_block(
+        self,
+        mode: str,
+        schema_info: Optional[Dict] = None,
+        problem_context: Optional[Dict] = None
+    ) -> str:
+        """Rendered problem/schema context for the mode, cached on a digest of its inputs"""
+        if mode == "interview":
+            key = (mode, _context_digest(problem_context))
+        else:
+            key = (mode, _context_digest(schema_info, problem_context))
+        
+        block = self._context_blocks.get(key)
+        if block is not None:
+            self._context_blocks.move_to_end(key)
+            return block
+        
+        if mode == "interview":
+            block = self._get_interview_context(problem_context)
+        else:
+            block = self._get_coding_context(schema_info, problem_context)
+        
+        self._context_blocks[key] = block
+        if len(self._context_blocks) > self.CONTEXT_CACHE_SIZE:
+            self._context_blocks.popitem(last=False)
+        return block
+    
+    def _get_coding_context(self, schema_info: Optional[Dict] = None, problem_context: Optional[Dict] = None) -> str:
+        """Problem and schema context for coding assistance mode"""
+        schema_text = ""
+        if schema_info:
+            schema_text = f"Available Tables:\n{schema_info}"
+        
+        problem_text = ""
+        if problem_context:
+            problem_text = "Problem Context:"
+            if problem_context.get('title'):
+                problem_text += f"\nTitle: {problem_context['title']}"
+            if problem_context.get('description'):
+                problem_text += f"\nDescription: {problem_context['description']}"
+            if problem_context.get('tables'):
+                problem_text += "\n\nTables Available:"
+                for table in problem_context['tables']:
+                    problem_text += f"\n- {table['name']} ({table.get('row_count', '?')} rows)"
+                    if table.get('schema'):
+                        # Schema might be dict or list
+                        if isinstance(table['schema'], dict):
+                            columns = ', '.join(table['schema'].keys())
+                        elif isinstance(table['schema'], list):
+                            columns = ', '.join([str(c) for c in table['schema']])
+                        else:
+                            columns = str(table['schema'])
+                        problem_text += f"\n  Columns: {columns}"
+        
+        return "\n\n".join(text for text in (schema_text, problem_text) if text)
+    
+    def _get_interview_context(self, problem_context: Optional[Dict] = None) -> str:
+        """Problem context for interview mode"""
+        problem_text = ""
+        if problem_context:
+            problem_text = "Problem Context:"
+            if problem_context.get('title'):
+                problem_text += f"\nProblem: {problem_context['title']}"
+            if problem_context.get('description'):
+                problem_text += f"\nDescription: {problem_context['description']}"
+            if problem_context.get('tables'):
+                tables_list = ', '.join([t['name'] for t in problem_context['tables']])
+                problem_text += f"\nTables Used: {tables_list}"
+        
+        return problem_text
     
     async def process_prompt(
         self, 
@@ -143,70 +339,189 @@ Remember: ONE short, specific question. No follow-ups. No multi-part questions."
             AI response
         """
         if not self.ai_engine:
-            return "AI service temporarily unavailable. Please try again."
-        
-        # Get appropriate system prompt
-        if mode == "interview":
-            system_prompt = self._get_interview_system_prompt(problem_context)
-        else:
-            schema_info = context_data.get("schema") if context_data else None
-            system_prompt = self._get_coding_system_prompt(schema_info, problem_context)
-        
-        # Build enhanced user message with context
-        enhanced_message = self._build_context_message(user_prompt, context_data)
+            return UNAVAILABLE_RESPONSE
         
-        # Get conversation history for this session
-        history = self.conversation_history.get(session_id, []) if session_id else None
+        system_prompt, enhanced_message, history = self._prepare_prompt(
+            user_prompt, context_data, session_id, mode, problem_context
+        )
         
         try:
             # Generate response
             logger.info(f"🔍 AI Helper calling engine: mode={mode}, session={session_id}, prompt_len={len(user_prompt)}")
-            response = await self.ai_engine.generate(
-                system_prompt=system_prompt,
-                user_message=enhanced_message,
-                conversation_history=history
-            )
+            async with self._engine_slot():
+                response = await self.ai_engine.generate(
+                    system_prompt=system_prompt,
+                    user_message=enhanced_message,
+                    conversation_history=history
+                )
             logger.info(f"✅ AI Helper got response: {response[:100]}...")
             
             # Update conversation history
-            if session_id:
-                if session_id not in self.conversation_history:
-                    self.conversation_history[session_id] = []
-                
-                self.conversation_history[session_id].append({
-                    "role": "user",
-                    "content": user_prompt
-                })
-                self.conversation_history[session_id].append({
-                    "role": "assistant",
-                    "content": response
-                })
-                
-                # Keep only last 10 exchanges
-                if len(self.conversation_history[session_id]) > 20:
-                    self.conversation_history[session_id] = self.conversation_history[session_id][-20:]
+            self._record_exchange(session_id, user_prompt, response)
             
             return response
         
         except Exception as e:
             logger.error(f"AI Helper error: {e}")
-            return "I encountered an error processing your request. Please try rephrasing your question."
+            return ERROR_RESPONSE
     
-    def _build_context_message(self, user_prompt: str, context_data: Optional[Dict[str, Any]]) -> str:
-        """Build context-enhanced user message"""
-        parts = []
+    async def process_prompt_stream(
+        self,
+        user_prompt: str,
+        context_data: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+        mode: str = "coding",
+        problem_context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Same as process_prompt, but yields the response as it is generated
         
-        if context_data:
-            if "code" in context_data and context_data["code"]:
-                parts.append(f"Current SQL Query:\n```sql\n{context_data['code']}\n```\n")
+        Args:
+            user_prompt: User's question
+            context_data: Additional context (code, errors, schema)
+            session_id: Session ID for conversation history
+            mode: 'coding' or 'interview'
+            problem_context: Problem details (title, description, tables)
+        
+        Yields:
+            Response text chunks
+        """
+        if not self.ai_engine:
+            yield UNAVAILABLE_RESPONSE
+            return
+        
+        system_prompt, enhanced_message, history = self._prepare_prompt(
+            user_prompt, context_data, session_id, mode, problem_context
+        )
+        
+        chunks = []
+        try:
+            logger.info(f"🔍 AI Helper streaming from engine: mode={mode}, session={session_id}, prompt_len={len(user_prompt)}")
+            async with self._engine_slot():
+                async for chunk in self.ai_engine.generate_stream(
+                    system_prompt=system_prompt,
+                    user_message=enhanced_message,
+                    conversation_history=history
+                ):
+                    chunks.append(chunk)
+                    yield chunk
+        except Exception as e:
+            logger.error(f"AI Helper stream error: {e}")
+            if not chunks:
+                yield ERROR_RESPONSE
+            return
+        
+        self._record_exchange(session_id, user_prompt, "".join(chunks))
+    
+    def _prepare_prompt(
+        self,
+        user_prompt: str,
+        context_data: Optional[Dict[str, Any]],
+        session_id: Optional[str],
+        mode: str,
+        problem_context: Optional[Dict[str, Any]]
+    ) -> Tuple[str, str, Optional[Any]]:
+        """System prompt, context-enhanced user message and history for a request"""
+        # Static system prompt; problem/schema context leads the user message
+        system_prompt = INTERVIEW_SYSTEM_PROMPT if mode == "interview" else CODING_SYSTEM_PROMPT
+        schema_info = context_data.get("schema") if context_data else None
+        context_block = self._get_context_block(mode, schema_info, problem_context)
+        
+        # Build enhanced user message with context
+        enhanced_message = self._build_context_message(user_prompt, context_data, context_block)
+        
+        # Get conversation history for this session
+        history = (self._get_history(session_id) or []) if session_id else None
+        
+        return system_prompt, enhanced_message, history
+    
+    def _record_exchange(self, session_id: Optional[str], user_prompt: str, response: str):
+        """Append a prompt/response pair to the session history"""
+        if not session_id:
+            return
+        
+        session_history = self._get_history(session_id, create=True)
+        session_history.append({
+            "role": "user",
+            "content": user_prompt
+        })
+        session_history.append({
+            "role": "assistant",
+            "content": response
+        })
+        
+        if (len(session_history) >= self.HISTORY_SUMMARIZE_AT
+                and session_id not in self._summarizing):
+            self._summarizing.add(session_id)
+            task = asyncio.create_task(self._summarize_history(session_id))
+            self._summary_tasks.add(task)
+            task.add_done_callback(self._summary_tasks.discard)
+    
+    async def _summarize_history(self, session_id: str):
+        """Replace the oldest history messages with a short generated summary"""
+        try:
+            history = self.conversation_history.get(session_id)
+            if not history:
+                return
+            
+            old_turns = list(history)[:self.HISTORY_SUMMARIZE_MESSAGES]
+            async with self._engine_slot():
+                summary = await self.ai_engine.generate(
+                    system_prompt=self.HISTORY_SUMMARY_PROMPT,
+                    user_message=json.dumps(old_turns),
+                    max_retries=1
+                )
             
-            if "error" in context_data and context_data["error"]:
-                parts.append(f"Error Message:\n{context_data['error']}\n")
+            # History may have been cleared or replaced while we waited
+            if self.conversation_history.get(session_id) is not history or not history or history[0] is not old_turns[0]:
+                return
             
-            if "query_result" in context_data:
-                parts.append(f"Query Result: {context_data['query_result']}\n")
+            for _ in old_turns:
+                history.popleft()
+            # Kept as a user/assistant turn rather than system text so the
+            # system prompt stays identical from turn to turn
+            history.appendleft({
+                "role": "assistant",
+                "content": "Understood, I'll keep that earlier context in mind."
+            })
+            history.appendleft({
+                "role": "user",
+                "content": f"Summary of the earlier conversation: {summary.strip()}"
+            })
+            logger.info(f"🗜️  Summarized {len(old_turns)} history messages for session {session_id}")
+        except Exception as e:
+            logger.warning(f"History summarization failed for session {session_id}: {e}")
+        finally:
+            self._summarizing.discard(session_id)
+    
+    def _build_context_message(
+        self,
+        user_prompt: str,
+        context_data: Optional[Dict[str, Any]],
+        context_block: str = ""
+    ) -> str:
+        """Build context-enhanced user message"""
+        question = f"Question: {user_prompt}"
+        
+        # Fast path: follow-up questions with no code/error context
+        if not context_data:
+            return f"{context_block}\n\n{question}" if context_block else question
+        
+        parts = [f"{context_block}\n"] if context_block else []
         
-        parts.append(f"Question: {user_prompt}")
+        if "code" in context_data and context_data["code"]:
+            code = context_data["code"]
+            if len(code) > self.MAX_CONTEXT_CODE_CHARS:
+                code = "...\n" + code[-self.MAX_CONTEXT_CODE_CHARS:]
+            parts.append(f"Current SQL Query:\n```sql\n{code}\n```\n")
+        
+        if "error" in context_data and context_data["error"]:
+            parts.append(f"Error Message:\n{context_data['error']}\n")
+        
+        if "query_result" in context_data:
+            parts.append(f"Query Result: {context_data['query_result']}\n")
+        
+        parts.append(question)
         
         return "\n".join(parts)
     
@@ -232,36 +547,25 @@ Remember: ONE short, specific question. No follow-ups. No multi-part questions."
         if not self.ai_engine:
             return "What was your approach to solving this problem?"
         
-        system_prompt = self._get_interview_system_prompt(problem_context)
+        context_block = self._get_context_block("interview", problem_context=problem_context)
         
         context_text = ""
         if problem_context:
             context_text = f"\nProblem: {problem_context.get('title', 'SQL Analysis Task')}"
         
         # Vary the focus based on question number
-        focus_areas = [
-            "their overall approach and strategy",
-            "a specific SQL technique or JOIN they used",
-            "how they would handle edge cases or scale this",
-            "what insights or patterns they discovered",
-            "what they learned or would do differently"
-        ]
-        focus = focus_areas[min(question_number - 1, len(focus_areas) - 1)]
+        focus = self._FOCUS_AREAS[min(question_number - 1, len(self._FOCUS_AREAS) - 1)]
+        
+        user_message = self._QUESTION_TEMPLATE.substitute(
+            context=f"{context_block}\n\n" if context_block else "",
+            number=question_number,
+            problem=context_text,
+            queries="\n".join(f"{i+1}. {q[:150]}..." for i, q in enumerate(query_history[-3:])),
+            focus=focus
+        )
         
-        user_message = f"""This is question #{question_number} of 5 in the interview.{context_text}
-
-Candidate's Recent SQL Queries:
-{chr(10).join([f"{i+1}. {q[:150]}..." for i, q in enumerate(query_history[-3:])])}
-
-Generate ONE SHORT question (1-2 sentences max) focusing on: {focus}
-
-Do not ask multiple questions. Do not ask for detailed explanations. Keep it conversational."""
-
         try:
-            question = await self.ai_engine.generate(
-                system_prompt=system_prompt,
-                user_message=user_message
-            )
+            question = await self._submit(INTERVIEW_SYSTEM_PROMPT, user_message)
             # Truncate if too long (safety check)
             if len(question) > 200:
                 question = question[:197] + "..."
@@ -269,39 +573,67 @@ Do not ask multiple questions. Do not ask for detailed explanations. Keep it con
         except Exception as e:
             logger.error(f"Failed to generate interview question: {e}")
             # Generic fallback
-            simple_questions = [
-                "What was your overall approach to this problem?",
-                "Why did you choose that SQL technique?",
-                "How would this work with a larger dataset?",
-                "What patterns did you notice in the data?",
-                "What would you improve if you had more time?"
-            ]
-            return simple_questions[min(question_number - 1, len(simple_questions) - 1)]
+            return self._FALLBACK_QUESTIONS[min(question_number - 1, len(self._FALLBACK_QUESTIONS) - 1)]
+    
+    async def _submit(self, system_prompt: str, user_message: str) -> str:
+        """Queue a prompt for the batch worker and wait for its response"""
+        if self._batch_worker_task is None or self._batch_worker_task.done():
+            self._question_queue = asyncio.Queue()
+            self._batch_worker_task = asyncio.create_task(self._batch_worker(self._question_queue))
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._question_queue.put((system_prompt, user_message, future))
+        return await future
+    
+    async def _batch_worker(self, queue: asyncio.Queue):
+        """Collect queued prompts within the batch window and generate them together"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.QUESTION_BATCH_WINDOW
+            while len(batch) < self.QUESTION_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                async with self._engine_slot():
+                    responses = await self.ai_engine.generate_batch(
+                        [(system_prompt, user_message) for system_prompt, user_message, _ in batch]
+                    )
+                for (_, _, future), response in zip(batch, responses):
+                    if not future.done():
+                        future.set_result(response)
+            except Exception as e:
+                logger.error(f"Batch generation failed for {len(batch)} prompts: {e}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
     
     def classify_intent(self, user_prompt: str) -> str:
         """Classify the intent of user's prompt"""
         prompt_lower = user_prompt.lower()
         
-        # Intent classification rules
-        if any(word in prompt_lower for word in ["what is", "explain", "define", "how does", "concept"]):
-            return "CONCEPT_HELP"
-        
-        elif any(word in prompt_lower for word in ["error", "bug", "debug", "fix", "wrong", "not working"]):
-            return "DEBUG_HELP"
-        
-        elif any(word in prompt_lower for word in ["approach", "strategy", "how to", "method", "technique"]):
-            return "APPROACH_HELP"
+        # Intent classification rules: best-priority keyword anywhere in the prompt
+        best_rank = None
+        for match in _INTENT_RE.finditer(prompt_lower):
+            rank = _INTENT_PRIORITY[match.lastgroup]
+            if best_rank is None or rank < best_rank:
+                best_rank = rank
+                if rank == 0:
+                    break
         
-        elif any(word in prompt_lower for word in ["check", "validate", "correct", "verify", "review"]):
-            return "VALIDATION"
-        
-        elif any(word in prompt_lower for word in ["solve", "solution", "answer", "complete", "finish"]):
-            return "DIRECT_SOLUTION"
-        
-        else:
+        if best_rank is None:
             return "EXPLANATION"
+        return INTENT_TABLE[best_rank][0]
     
     def clear_history(self, session_id: str):
         """Clear conversation history for a session"""
         if session_id in self.conversation_history:
             del self.conversation_history[session_id]
+            del self._history_last_used[session_id]
+        self._summarizing.discard(session_id)
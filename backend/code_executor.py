@@ -2,9 +2,25 @@
 import subprocess
 import tempfile
 import os
+import signal
 import sys
 from typing import Dict, Tuple
 
+try:
+    import resource  # POSIX only
+except ImportError:
+    resource = None
+
+# Address-space cap for candidate code (MB); numpy/pandas import fits well under this
+MEMORY_LIMIT_MB = int(os.getenv("CODE_MEMORY_LIMIT_MB", "512"))
+
+
+def _limit_memory():
+    """preexec_fn: cap the child's address space"""
+    limit = MEMORY_LIMIT_MB * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
 class CodeExecutor:
     """Execute Python code in a controlled environment"""
     
@@ -17,36 +33,55 @@ class CodeExecutor:
         """
         Execute Python code and return results
         
+        Every run gets a fresh interpreter, so nothing one candidate's code
+        defines or imports is visible to the next run.
+        
         Returns:
             Tuple of (success, stdout, stderr)
         """
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-            f.write(code)
-            temp_file = f.name
-        
         try:
-            # Execute Python code using venv's Python interpreter
-            result = subprocess.run(
-                [self.python_executable, temp_file],
-                capture_output=True,
+            # Execute Python code using venv's Python interpreter, reading the
+            # program from stdin so no temp file has to be written and removed.
+            # The child leads its own process group so a timeout can kill
+            # anything it spawned too.
+            process = subprocess.Popen(
+                [self.python_executable, "-"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=self.timeout,
-                cwd=tempfile.gettempdir()
+                cwd=tempfile.gettempdir(),
+                start_new_session=True,
+                preexec_fn=self._limit_subprocess if resource is not None else None
             )
-            
-            # Clean up
-            os.unlink(temp_file)
-            
-            success = result.returncode == 0
-            return success, result.stdout, result.stderr
-            
+        except Exception as e:
+            return False, "", f"Execution error: {str(e)}"
+        
+        try:
+            stdout, stderr = process.communicate(input=code, timeout=self.timeout)
         except subprocess.TimeoutExpired:
-            if os.path.exists(temp_file):
-                os.unlink(temp_file)
+            # Wall-clock limit, enforced here rather than inside the child
+            self._kill_process_group(process)
             return False, "", f"Code execution timed out ({self.timeout}s limit)"
-            
         except Exception as e:
-            if os.path.exists(temp_file):
-                os.unlink(temp_file)
+            self._kill_process_group(process)
             return False, "", f"Execution error: {str(e)}"
+        
+        success = process.returncode == 0
+        return success, stdout, stderr
+    
+    def _kill_process_group(self, process: subprocess.Popen):
+        """Kill the child and everything in its process group, then reap it"""
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            process.kill()
+        process.communicate()
+    
+    def _limit_subprocess(self):
+        """preexec_fn: memory and CPU caps, set before the candidate code starts
+        
+        Soft and hard limits are equal, so the code cannot raise them again.
+        """
+        _limit_memory()
+        resource.setrlimit(resource.RLIMIT_CPU, (self.timeout, self.timeout))
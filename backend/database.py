@@ -1,8 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
 from contextlib import contextmanager
 import os
+import logging
 from pathlib import Path
 from models import Base
 from typing import Generator
@@ -10,20 +10,38 @@ from typing import Generator
 # Database configuration
 DATABASE_URL = "sqlite:///./ai_interview.db"
 
+# Keep SQLAlchemy's statement logging quiet unless echo is enabled
+logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
+
 # Create database directory if it doesn't exist
 db_path = Path("./ai_interview.db")
 db_path.parent.mkdir(exist_ok=True)
 
 # Create SQLAlchemy engine
+# Pooled connections (one per concurrent request) instead of a single shared
+# one; with WAL below, readers no longer wait on the writer
 engine = create_engine(
     DATABASE_URL,
     connect_args={
-        "check_same_thread": False  # Needed for SQLite
+        "check_same_thread": False,  # Needed for SQLite
+        "timeout": 5  # Seconds to wait on a locked database
     },
-    poolclass=StaticPool,
-    echo=True  # Set to False in production
+    pool_size=20,
+    max_overflow=40,
+    echo=os.getenv("SQL_ECHO", "0") == "1"  # Statement logging is opt-in (SQL_ECHO=1)
 )
 
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Configure each new SQLite connection for concurrent access"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -63,31 +81,45 @@ def init_database():
         print(f"Error initializing database: {e}")
         raise
 
+# Set once migrations have run in this process
+_MIGRATED = False
+
 def migrate_database():
     """Run database migrations to add new columns"""
-    import sqlite3
-    
-    db_file = "./ai_interview.db"
-    if not os.path.exists(db_file):
+    global _MIGRATED
+    if _MIGRATED:
         return
     
-    conn = sqlite3.connect(db_file)
-    cursor = conn.cursor()
-    
     try:
-        # Check if notebook_data column exists
-        cursor.execute("PRAGMA table_info(sessions)")
-        columns = [row[1] for row in cursor.fetchall()]
-        
-        if 'notebook_data' not in columns:
-            print("📝 Adding notebook_data column to sessions table...")
-            cursor.execute("ALTER TABLE sessions ADD COLUMN notebook_data TEXT")
-            conn.commit()
-            print("✅ Added notebook_data column")
+        with engine.begin() as conn:
+            # Check if notebook_data column exists
+            columns = {column["name"] for column in inspect(conn).get_columns("sessions")}
+            
+            if 'notebook_data' not in columns:
+                print("📝 Adding notebook_data column to sessions table...")
+                conn.execute(text("ALTER TABLE sessions ADD COLUMN notebook_data TEXT"))
+                print("✅ Added notebook_data column")
+            
+            # Composite indexes used by session analysis (create_all skips existing tables)
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_events_session_seq "
+                "ON events (session_id, sequence_number)"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_events_session_type "
+                "ON events (session_id, event_type)"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_ai_interactions_session_ts "
+                "ON ai_interactions (session_id, timestamp)"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_features_session "
+                "ON features (session_id)"
+            ))
+        _MIGRATED = True
     except Exception as e:
         print(f"Migration warning: {e}")
-    finally:
-        conn.close()
 
 if __name__ == "__main__":
     init_database()
\ No newline at end of file
@@ -1,14 +1,86 @@
+from sqlalchemy import func, case, and_, insert, select
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session
 from models import Event, AIInteraction, Feature, FEATURE_DIMENSIONS
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
+from dataclasses import dataclass
+from collections import Counter, OrderedDict
+import asyncio
+import numpy as np
 import statistics
 import json
 
+# Events with sequence_number up to this count as early exploration
+EARLY_EVENT_WINDOW = 10
+# Edits within this many events after an error count as a debugging response
+ERROR_EDIT_WINDOW = 5
+# Prompts longer than this are considered detailed questions
+DETAILED_PROMPT_CHARS = 50
+
+
+# Evidence with numbers is recorded as (template key, *args) and only
+# rendered by format_evidence when the feature rows are written
+EVIDENCE_TEMPLATES = {
+    "explored_data_early": "Explored data early ({0} views)",
+    "systematic_exploration": "Systematic data exploration ({0} views)",
+    "iterative_testing": "Iterative testing approach ({0} runs)",
+    "sought_validation": "Sought validation ({0} times)",
+    "high_resolution_rate": "High error resolution rate ({0:.1%})",
+    "high_ai_frequency": "High AI request frequency ({0:.1%})",
+    "frequent_solution_requests": "Frequent direct solution requests ({0})",
+    "low_ai_utilization": "Low AI response utilization ({0:.1%})",
+    "constructive_requests": "High ratio of constructive requests ({0:.1%})",
+    "detailed_prompts": "Provided detailed context in prompts ({0:.1%})",
+    "strategic_guidance": "Sought strategic guidance ({0} times)",
+    "iteration_cycles": "Multiple iteration cycles ({0})",
+    "incremental_development": "Incremental code development ({0} edits)",
+    "frequent_testing": "Frequent testing approach ({0} runs)"
+}
+
+
+def format_evidence(evidence: List[Any]) -> List[str]:
+    """Render evidence entries (plain strings or template tuples) to text"""
+    return [
+        item if isinstance(item, str) else EVIDENCE_TEMPLATES[item[0]].format(*item[1:])
+        for item in evidence
+    ]
+
+
+@dataclass(slots=True)
+class SessionStats:
+    """Per-session counts shared by all feature processors (built in one pass)"""
+    # Events
+    code_runs: int = 0
+    code_edits: int = 0
+    data_views: int = 0
+    errors: int = 0
+    resolutions: int = 0
+    result_evaluations: int = 0
+    early_data_views: int = 0
+    edits_after_errors: int = 0
+    total_events: int = 0
+    # AI interactions
+    approach_help: int = 0
+    validation: int = 0
+    debug_help: int = 0
+    concept_help: int = 0
+    solution_requests: int = 0
+    used_responses: int = 0
+    detailed_prompts: int = 0
+    total_ai: int = 0
+
+
 class EventProcessor:
     """Process behavioral events into recruiter insights"""
     
+    # Sessions whose last computed features are kept for unchanged re-runs
+    FEATURE_CACHE_SIZE = 1024
+    
     def __init__(self):
+        # (session_id, max sequence, event count, AI count, used responses) -> features
+        self._feature_cache: "OrderedDict[tuple, Dict[str, float]]" = OrderedDict()
+
         self.feature_processors = {
             "Problem Understanding": self._compute_problem_understanding,
             "Analytical Thinking": self._compute_analytical_thinking,
@@ -21,67 +93,201 @@ class EventProcessor:
             "Data Exploration Skills": self._compute_data_exploration,
             "Communication Clarity": self._compute_communication_clarity
         }
+        
+        # Results for a session with no events or AI interactions, evaluated once
+        self._empty_session_results = self._evaluate(SessionStats())
     
     async def compute_features(self, session_id: str, db: Session) -> Dict[str, float]:
         """Compute all behavioral features for a session"""
-        # Get all events and AI interactions for the session
-        events = db.query(Event).filter(
-            Event.session_id == session_id
-        ).order_by(Event.sequence_number).all()
+        # Sessions with no new events or AI activity since the last run reuse
+        # its result (the Feature rows from that run are already stored)
+        cache_key = await self._session_fingerprint(session_id, db)
+        cached = self._feature_cache.get(cache_key)
+        if cached is not None:
+            self._feature_cache.move_to_end(cache_key)
+            return dict(cached)
+        
+        # Fingerprint is (session_id, max sequence, event count, AI count, used)
+        if cache_key[2] == 0 and cache_key[3] == 0:
+            # Nothing recorded yet, so skip the aggregate queries entirely
+            results = self._empty_session_results
+        else:
+            stats = await self._load_stats(session_id, db)
+            results = self._evaluate(stats)
         
-        ai_interactions = db.query(AIInteraction).filter(
-            AIInteraction.session_id == session_id
-        ).order_by(AIInteraction.timestamp).all()
-        
-        # Compute each feature
         computed_features = {}
+        feature_rows = []
         
+        for feature_name, feature_data in results:
+            if feature_data is None:
+                computed_features[feature_name] = 0.0
+                continue
+            
+            feature_rows.append({
+                "session_id": session_id,
+                "feature_name": feature_name,
+                "feature_value": feature_data["value"],
+                "confidence_score": feature_data["confidence"],
+                "evidence": feature_data["evidence"]
+            })
+            computed_features[feature_name] = feature_data["value"]
+        
+        # Store all features with one multi-row INSERT
+        if feature_rows:
+            db.execute(insert(Feature), feature_rows)
+        db.commit()
+        
+        self._feature_cache[cache_key] = dict(computed_features)
+        if len(self._feature_cache) > self.FEATURE_CACHE_SIZE:
+            self._feature_cache.popitem(last=False)
+        return computed_features
+    
+    def _evaluate(self, stats: SessionStats) -> List[Tuple[str, Optional[Dict[str, Any]]]]:
+        """Run every feature processor, rendering evidence (None for a failed feature)"""
+        results = []
         for feature_name, processor in self.feature_processors.items():
             try:
-                feature_data = processor(events, ai_interactions)
-                
-                # Store feature in database
-                feature = Feature(
-                    session_id=session_id,
-                    feature_name=feature_name,
-                    feature_value=feature_data["value"],
-                    confidence_score=feature_data["confidence"],
-                    evidence=feature_data["evidence"]
-                )
-                db.add(feature)
-                computed_features[feature_name] = feature_data["value"]
-                
+                feature_data = processor(stats)
+                feature_data["evidence"] = format_evidence(feature_data["evidence"])
+                results.append((feature_name, feature_data))
             except Exception as e:
                 print(f"Error computing {feature_name}: {e}")
-                computed_features[feature_name] = 0.0
-        
-        db.commit()
-        return computed_features
+                results.append((feature_name, None))
+        return results
+    
+    async def _session_fingerprint(self, session_id: str, db: Session) -> tuple:
+        """Cheap key that changes whenever the session's features could change"""
+        fingerprint_stmt = select(
+            select(func.max(Event.sequence_number)).where(Event.session_id == session_id).scalar_subquery(),
+            select(func.count()).select_from(Event).where(Event.session_id == session_id).scalar_subquery(),
+            select(func.count()).select_from(AIInteraction).where(AIInteraction.session_id == session_id).scalar_subquery(),
+            select(func.sum(case((AIInteraction.response_used.is_(True), 1), else_=0))).where(
+                AIInteraction.session_id == session_id
+            ).scalar_subquery()
+        )
+        rows = await asyncio.to_thread(self._fetch_all, db.get_bind(), fingerprint_stmt)
+        return (session_id, *rows[0])
+    
+    @staticmethod
+    def _fetch_all(engine: Engine, statement) -> List[Any]:
+        """Run a read-only statement on its own pooled connection (called in a worker thread)"""
+        with engine.connect() as conn:
+            return conn.execute(statement).all()
+    
+    @staticmethod
+    def _count_edits_after_errors(window_rows: List[Any]) -> int:
+        """Total CODE_EDITs in (error, error + window] over all errors, vectorized"""
+        # (sequence_number, is_edit) integer pairs straight into one array
+        window = np.array(window_rows, dtype=np.int64).reshape(-1, 2)
+        seqs = window[:, 0]
+        is_edit = window[:, 1].astype(bool)
+        
+        # Rows are ordered by sequence, so the edit sequence array is sorted
+        edit_seqs = seqs[is_edit]
+        error_seqs = seqs[~is_edit]
+        window_end = np.searchsorted(edit_seqs, error_seqs + ERROR_EDIT_WINDOW, side="right")
+        window_start = np.searchsorted(edit_seqs, error_seqs, side="right")
+        return int((window_end - window_start).sum())
+    
+    async def _load_stats(self, session_id: str, db: Session) -> SessionStats:
+        """Aggregate every count the features use in the database instead of loading rows"""
+        engine = db.get_bind()
+        
+        # Per-type event counts (plus early data views) in one GROUP BY
+        event_stmt = select(
+            Event.event_type,
+            func.count(),
+            func.sum(case(
+                (and_(Event.event_type == "DATA_VIEW", Event.sequence_number <= EARLY_EVENT_WINDOW), 1),
+                else_=0
+            ))
+        ).where(
+            Event.session_id == session_id
+        ).group_by(Event.event_type)
+        
+        # Per-intent AI counts with usage and prompt detail in one GROUP BY
+        ai_stmt = select(
+            AIInteraction.intent_label,
+            func.count(),
+            func.sum(case((AIInteraction.response_used.is_(True), 1), else_=0)),
+            func.sum(case((func.length(AIInteraction.user_prompt) > DETAILED_PROMPT_CHARS, 1), else_=0))
+        ).where(
+            AIInteraction.session_id == session_id
+        ).group_by(AIInteraction.intent_label)
+        
+        # Both aggregates run concurrently off the event loop, each on its own connection
+        event_rows, ai_rows = await asyncio.gather(
+            asyncio.to_thread(self._fetch_all, engine, event_stmt),
+            asyncio.to_thread(self._fetch_all, engine, ai_stmt)
+        )
+        
+        event_counts = Counter()
+        early_data_views = 0
+        for event_type, count, early_views in event_rows:
+            event_counts[event_type] = count
+            early_data_views += early_views or 0
+        
+        # Only errors and edits are needed row-by-row, for the debugging window
+        edits_after_errors = 0
+        if event_counts["ERROR_OCCURRED"] and event_counts["CODE_EDIT"]:
+            # Event type comes back as a 0/1 edit flag so no strings reach Python
+            window_stmt = select(
+                Event.sequence_number,
+                case((Event.event_type == "CODE_EDIT", 1), else_=0)
+            ).where(
+                Event.session_id == session_id,
+                Event.event_type.in_(("CODE_EDIT", "ERROR_OCCURRED"))
+            ).order_by(Event.sequence_number)
+            window_rows = await asyncio.to_thread(self._fetch_all, engine, window_stmt)
+            edits_after_errors = self._count_edits_after_errors(window_rows)
+        
+        intent_counts = Counter()
+        used_responses = 0
+        detailed_prompts = 0
+        for intent_label, count, used, detailed in ai_rows:
+            intent_counts[intent_label] = count
+            used_responses += used or 0
+            detailed_prompts += detailed or 0
+        
+        return SessionStats(
+            code_runs=event_counts["CODE_RUN"],
+            code_edits=event_counts["CODE_EDIT"],
+            data_views=event_counts["DATA_VIEW"],
+            errors=event_counts["ERROR_OCCURRED"],
+            resolutions=event_counts["ERROR_RESOLVED"],
+            result_evaluations=event_counts["RESULT_EVALUATED"],
+            early_data_views=early_data_views,
+            edits_after_errors=edits_after_errors,
+            total_events=sum(event_counts.values()),
+            approach_help=intent_counts["APPROACH_HELP"],
+            validation=intent_counts["VALIDATION"],
+            debug_help=intent_counts["DEBUG_HELP"],
+            concept_help=intent_counts["CONCEPT_HELP"],
+            solution_requests=intent_counts["DIRECT_SOLUTION"],
+            used_responses=used_responses,
+            detailed_prompts=detailed_prompts,
+            total_ai=sum(intent_counts.values())
+        )
     
-    def _compute_problem_understanding(self, events: List[Event], ai_interactions: List[AIInteraction]) -> Dict[str, Any]:
+    def _compute_problem_understanding(self, stats: SessionStats) -> Dict[str, Any]:
         """Measure how well candidate understands the problem"""
         evidence = []
         
         # Look for early exploration patterns
-        early_events = [e for e in events if e.sequence_number <= 10]
-        data_exploration_early = len([e for e in early_events if e.event_type == "DATA_VIEW"])
+        data_exploration_early = stats.early_data_views
         
         # Check for clarifying questions about problem
-        concept_help_requests = len([
-            ai for ai in ai_interactions 
-            if ai.intent_label == "CONCEPT_HELP"
-        ])
+        concept_help_requests = stats.concept_help
         
         # Measure code structure quality
-        code_edits = [e for e in events if e.event_type == "CODE_EDIT"]
-        structured_approach = len(code_edits) > 5  # Multiple iterative edits
+        structured_approach = stats.code_edits > 5  # Multiple iterative edits
         
         # Calculate score (0-1 scale)
         score = 0.0
         
         if data_exploration_early > 0:
             score += 0.3
-            evidence.append(f"Explored data early ({data_exploration_early} views)")
+            evidence.append(("explored_data_early", data_exploration_early))
         
         if concept_help_requests <= 2:  # Not too many concept questions
             score += 0.3
@@ -97,37 +303,34 @@ class EventProcessor:
             "evidence": evidence
         }
     
-    def _compute_analytical_thinking(self, events: List[Event], ai_interactions: List[AIInteraction]) -> Dict[str, Any]:
+    def _compute_analytical_thinking(self, stats: SessionStats) -> Dict[str, Any]:
         """Measure analytical and logical thinking patterns"""
         evidence = []
         
         # Look for systematic data exploration
-        data_views = [e for e in events if e.event_type == "DATA_VIEW"]
-        systematic_exploration = len(data_views) >= 3
+        data_views = stats.data_views
+        systematic_exploration = data_views >= 3
         
         # Check for hypothesis testing patterns (run -> analyze -> iterate)
-        run_events = [e for e in events if e.event_type == "CODE_RUN"]
-        analysis_pattern = len(run_events) >= 2
+        run_events = stats.code_runs
+        analysis_pattern = run_events >= 2
         
         # Look for validation requests
-        validation_requests = len([
-            ai for ai in ai_interactions 
-            if ai.intent_label == "VALIDATION"
-        ])
+        validation_requests = stats.validation
         
         score = 0.0
         
         if systematic_exploration:
             score += 0.4
-            evidence.append(f"Systematic data exploration ({len(data_views)} views)")
+            evidence.append(("systematic_exploration", data_views))
         
         if analysis_pattern:
             score += 0.3
-            evidence.append(f"Iterative testing approach ({len(run_events)} runs)")
+            evidence.append(("iterative_testing", run_events))
         
         if validation_requests > 0:
             score += 0.3
-            evidence.append(f"Sought validation ({validation_requests} times)")
+            evidence.append(("sought_validation", validation_requests))
         
         return {
             "value": min(score, 1.0),
@@ -135,38 +338,28 @@ class EventProcessor:
             "evidence": evidence
         }
     
-    def _compute_debugging_ability(self, events: List[Event], ai_interactions: List[AIInteraction]) -> Dict[str, Any]:
+    def _compute_debugging_ability(self, stats: SessionStats) -> Dict[str, Any]:
         """Measure debugging and problem-solving skills"""
         evidence = []
         
         # Count errors and resolutions
-        errors = [e for e in events if e.event_type == "ERROR_OCCURRED"]
-        resolutions = [e for e in events if e.event_type == "ERROR_RESOLVED"]
-        resolution_rate = len(resolutions) / max(len(errors), 1)
+        errors = stats.errors
+        resolutions = stats.resolutions
+        resolution_rate = resolutions / max(errors, 1)
         
         # Check for independent debugging vs AI help
-        debug_help_requests = len([
-            ai for ai in ai_interactions 
-            if ai.intent_label == "DEBUG_HELP"
-        ])
+        debug_help_requests = stats.debug_help
         
         # Look for systematic debugging approach
-        code_edits_after_errors = 0
-        for error in errors:
-            subsequent_edits = len([
-                e for e in events 
-                if e.event_type == "CODE_EDIT" and e.sequence_number > error.sequence_number
-                and e.sequence_number <= error.sequence_number + 5
-            ])
-            code_edits_after_errors += subsequent_edits
+        code_edits_after_errors = stats.edits_after_errors
         
         score = 0.0
         
         if resolution_rate >= 0.7:
             score += 0.4
-            evidence.append(f"High error resolution rate ({resolution_rate:.1%})")
+            evidence.append(("high_resolution_rate", resolution_rate))
         
-        if debug_help_requests <= len(errors) * 0.5:  # Didn't ask for help on every error
+        if debug_help_requests <= errors * 0.5:  # Didn't ask for help on every error
             score += 0.3
             evidence.append("Showed independent debugging effort")
         
@@ -180,25 +373,19 @@ class EventProcessor:
             "evidence": evidence
         }
     
-    def _compute_ai_reliance(self, events: List[Event], ai_interactions: List[AIInteraction]) -> Dict[str, Any]:
+    def _compute_ai_reliance(self, stats: SessionStats) -> Dict[str, Any]:
         """Measure balance between independence and AI assistance"""
         evidence = []
         
-        total_ai_requests = len(ai_interactions)
-        total_events = len(events)
+        total_ai_requests = stats.total_ai
+        total_events = stats.total_events
         ai_request_ratio = total_ai_requests / max(total_events, 1)
         
         # Check for direct solution requests (negative indicator)
-        solution_requests = len([
-            ai for ai in ai_interactions 
-            if ai.intent_label == "DIRECT_SOLUTION"
-        ])
+        solution_requests = stats.solution_requests
         
         # Check if AI responses were actually used
-        used_responses = len([
-            ai for ai in ai_interactions 
-            if ai.response_used
-        ])
+        used_responses = stats.used_responses
         usage_rate = used_responses / max(total_ai_requests, 1)
         
         # Calculate independence score (higher is more independent)
@@ -206,15 +393,15 @@ class EventProcessor:
         
         if ai_request_ratio > 0.3:  # Too many AI requests relative to actions
             score -= 0.4
-            evidence.append(f"High AI request frequency ({ai_request_ratio:.1%})")
+            evidence.append(("high_ai_frequency", ai_request_ratio))
         
         if solution_requests > 2:
             score -= 0.3
-            evidence.append(f"Frequent direct solution requests ({solution_requests})")
+            evidence.append(("frequent_solution_requests", solution_requests))
         
         if usage_rate < 0.5 and total_ai_requests > 0:  # Asking but not using responses
             score -= 0.2
-            evidence.append(f"Low AI response utilization ({usage_rate:.1%})")
+            evidence.append(("low_ai_utilization", usage_rate))
         
         # Bonus for strategic AI use
         if 0.1 <= ai_request_ratio <= 0.2 and usage_rate > 0.7:
@@ -227,42 +414,39 @@ class EventProcessor:
             "evidence": evidence
         }
     
-    def _compute_ai_collaboration(self, events: List[Event], ai_interactions: List[AIInteraction]) -> Dict[str, Any]:
+    def _compute_ai_collaboration(self, stats: SessionStats) -> Dict[str, Any]:
         """Measure quality of AI collaboration"""
         evidence = []
         
-        if not ai_interactions:
+        if not stats.total_ai:
             return {"value": 0.0, "confidence": 1.0, "evidence": ["No AI interactions"]}
         
         # Check for good collaboration patterns
-        approach_help = len([ai for ai in ai_interactions if ai.intent_label == "APPROACH_HELP"])
-        validation_requests = len([ai for ai in ai_interactions if ai.intent_label == "VALIDATION"])
+        approach_help = stats.approach_help
+        validation_requests = stats.validation
         
         # Quality indicators
-        total_requests = len(ai_interactions)
+        total_requests = stats.total_ai
         constructive_requests = approach_help + validation_requests
         constructive_ratio = constructive_requests / total_requests
         
         # Check for context-rich prompts (longer, more detailed)
-        detailed_prompts = len([
-            ai for ai in ai_interactions 
-            if len(ai.user_prompt) > 50  # Detailed questions
-        ])
+        detailed_prompts = stats.detailed_prompts
         detail_ratio = detailed_prompts / total_requests
         
         score = 0.0
         
         if constructive_ratio >= 0.5:
             score += 0.4
-            evidence.append(f"High ratio of constructive requests ({constructive_ratio:.1%})")
+            evidence.append(("constructive_requests", constructive_ratio))
         
         if detail_ratio >= 0.6:
             score += 0.3
-            evidence.append(f"Provided detailed context in prompts ({detail_ratio:.1%})")
+            evidence.append(("detailed_prompts", detail_ratio))
         
         if approach_help > 0:
             score += 0.3
-            evidence.append(f"Sought strategic guidance ({approach_help} times)")
+            evidence.append(("strategic_guidance", approach_help))
         
         return {
             "value": min(score, 1.0),
@@ -270,33 +454,33 @@ class EventProcessor:
             "evidence": evidence
         }
     
-    def _compute_iterative_thinking(self, events: List[Event], ai_interactions: List[AIInteraction]) -> Dict[str, Any]:
+    def _compute_iterative_thinking(self, stats: SessionStats) -> Dict[str, Any]:
         """Measure iterative and incremental approach"""
         evidence = []
         
         # Look for iterative patterns: edit -> run -> analyze -> repeat
-        code_runs = [e for e in events if e.event_type == "CODE_RUN"]
-        result_evaluations = [e for e in events if e.event_type == "RESULT_EVALUATED"]
+        code_runs = stats.code_runs
+        result_evaluations = stats.result_evaluations
         
-        iteration_cycles = min(len(code_runs), len(result_evaluations))
+        iteration_cycles = min(code_runs, result_evaluations)
         
         # Check for incremental code changes
-        code_edits = [e for e in events if e.event_type == "CODE_EDIT"]
-        incremental_pattern = len(code_edits) > 3  # Multiple small changes
+        code_edits = stats.code_edits
+        incremental_pattern = code_edits > 3  # Multiple small changes
         
         score = 0.0
         
         if iteration_cycles >= 2:
             score += 0.5
-            evidence.append(f"Multiple iteration cycles ({iteration_cycles})")
+            evidence.append(("iteration_cycles", iteration_cycles))
         
         if incremental_pattern:
             score += 0.3
-            evidence.append(f"Incremental code development ({len(code_edits)} edits)")
+            evidence.append(("incremental_development", code_edits))
         
-        if len(code_runs) >= 3:
+        if code_runs >= 3:
             score += 0.2
-            evidence.append(f"Frequent testing approach ({len(code_runs)} runs)")
+            evidence.append(("frequent_testing", code_runs))
         
         return {
             "value": min(score, 1.0),
@@ -305,18 +489,18 @@ class EventProcessor:
         }
     
     # Placeholder implementations for remaining features
-    def _compute_code_quality(self, events: List[Event], ai_interactions: List[AIInteraction]) -> Dict[str, Any]:
+    def _compute_code_quality(self, stats: SessionStats) -> Dict[str, Any]:
         """Placeholder for code quality assessment"""
         return {"value": 0.5, "confidence": 0.3, "evidence": ["Code quality assessment not implemented"]}
     
-    def _compute_error_handling(self, events: List[Event], ai_interactions: List[AIInteraction]) -> Dict[str, Any]:
+    def _compute_error_handling(self, stats: SessionStats) -> Dict[str, Any]:
         """Placeholder for error handling assessment"""
         return {"value": 0.5, "confidence": 0.3, "evidence": ["Error handling assessment not implemented"]}
     
-    def _compute_data_exploration(self, events: List[Event], ai_interactions: List[AIInteraction]) -> Dict[str, Any]:
+    def _compute_data_exploration(self, stats: SessionStats) -> Dict[str, Any]:
         """Placeholder for data exploration skills assessment"""
         return {"value": 0.5, "confidence": 0.3, "evidence": ["Data exploration assessment not implemented"]}
     
-    def _compute_communication_clarity(self, events: List[Event], ai_interactions: List[AIInteraction]) -> Dict[str, Any]:
+    def _compute_communication_clarity(self, stats: SessionStats) -> Dict[str, Any]:
         """Placeholder for communication clarity assessment"""
         return {"value": 0.5, "confidence": 0.3, "evidence": ["Communication clarity assessment not implemented"]}
\ No newline at end of file
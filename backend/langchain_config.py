@@ -4,8 +4,13 @@ Supports: Mistral Ollama (primary), Google Gemini (fallback)
 """
 
 import os
-from typing import Optional, Dict, Any, List
-from langchain_community.llms import Ollama
+import time
+import asyncio
+import hashlib
+import orjson
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
+from langchain_community.chat_models import ChatOllama
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
 import logging
@@ -16,6 +21,10 @@ logger = logging.getLogger(__name__)
 class MultiModelAI:
     """Multi-model AI with automatic fallback support"""
     
+    # Responses to identical prompts without conversation history are reused for a while
+    RESPONSE_CACHE_SIZE = 2048
+    RESPONSE_CACHE_TTL = 3600  # seconds
+    
     def __init__(self, gemini_api_key: Optional[str] = None):
         """
         Initialize multi-model AI system
@@ -26,6 +35,12 @@ class MultiModelAI:
         self.gemini_api_key = gemini_api_key or os.getenv("GEMINI_API_KEY")
         self.models = []
         self.current_model_index = 0
+        # Upper bound (seconds) on a single model call before it counts as failed
+        self.request_timeout = float(os.getenv("AI_REQUEST_TIMEOUT", "60"))
+        # digest -> (expires_at, response), oldest use first
+        self._response_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # digest -> future of the model call currently producing that response
+        self._pending_responses: Dict[str, asyncio.Future] = {}
         
         # Initialize available models
         self._init_models()
@@ -38,16 +53,28 @@ class MultiModelAI:
         
         # 1. Mistral Ollama (Primary) - Local, fast, free
         try:
-            mistral = Ollama(
+            # Chat model so the system role and conversation history reach Ollama's /api/chat
+            # (langchain-community 0.0.13 has no keep_alive field; how long the model
+            # stays resident is set on the Ollama server with OLLAMA_KEEP_ALIVE)
+            mistral = ChatOllama(
                 model="mistral",
                 base_url=ollama_base_url,
                 temperature=0.3
             )
-            # Test connection
-            mistral.invoke("test")
+            # Test connection and load the weights now rather than on the first
+            # candidate request; one token is enough to warm the model. An explicit
+            # "options" kwarg is sent to Ollama as the request's options verbatim.
+            mistral.invoke("test", options={"num_predict": 1})
             self.models.append({
                 "name": "Mistral (Ollama)",
                 "client": mistral,
+                # Same model constrained to a JSON object, for json_mode calls
+                "json_client": ChatOllama(
+                    model="mistral",
+                    base_url=ollama_base_url,
+                    temperature=0.3,
+                    format="json"
+                ),
                 "type": "ollama"
             })
             logger.info(f"✅ Mistral Ollama initialized at {ollama_base_url}")
@@ -81,7 +108,9 @@ class MultiModelAI:
         system_prompt: str, 
         user_message: str,
         conversation_history: Optional[List[Dict[str, str]]] = None,
-        max_retries: int = 2
+        max_retries: int = 2,
+        json_mode: bool = False,
+        use_cache: bool = True
     ) -> str:
         """
         Generate AI response with automatic fallback
@@ -91,6 +120,11 @@ class MultiModelAI:
             user_message: User's question/prompt
             conversation_history: Previous messages (for context)
             max_retries: Number of retries per model
+            json_mode: Constrain output to a JSON object where the model supports it
+                (the Ollama client built with format="json"); other models rely on the prompt
+            use_cache: Reuse/store the response for identical prompts. Only applies when
+                conversation_history is None; any history, even an empty one, means
+                the prompt belongs to a session and is never shared
         
         Returns:
             AI generated response
@@ -98,39 +132,74 @@ class MultiModelAI:
         if not self.models:
             return "AI service unavailable. Please contact support."
         
+        # Only prompts without per-session history are shared across callers
+        cache_key = None
+        if use_cache and conversation_history is None:
+            cache_key = self._response_cache_key(system_prompt, user_message, json_mode)
+            cached = self._cached_response(cache_key)
+            if cached is not None:
+                logger.info("✅ Response served from cache")
+                return cached
+        
+        # Identical history-free prompts already in flight share one model call
+        if cache_key is not None:
+            pending = self._pending_responses.get(cache_key)
+            while pending is not None:
+                logger.info("🔗 Joining in-flight request for identical prompt")
+                response = await asyncio.shield(pending)
+                if response is not None:
+                    return response
+                # The leading call ended without a result (e.g. its client went
+                # away): join a newer call for this prompt or make our own
+                pending = self._pending_responses.get(cache_key)
+            
+            pending = asyncio.get_running_loop().create_future()
+            self._pending_responses[cache_key] = pending
+            try:
+                response = await self._generate_with_fallback(
+                    system_prompt, user_message, conversation_history, max_retries, json_mode, cache_key
+                )
+                pending.set_result(response)
+                return response
+            finally:
+                del self._pending_responses[cache_key]
+                if not pending.done():
+                    # Never cancel the shared future: that would abort every joiner
+                    pending.set_result(None)
+        
+        return await self._generate_with_fallback(
+            system_prompt, user_message, conversation_history, max_retries, json_mode, cache_key
+        )
+    
+    async def _generate_with_fallback(
+        self,
+        system_prompt: str,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]],
+        max_retries: int,
+        json_mode: bool,
+        cache_key: Optional[str]
+    ) -> str:
+        """Try each model in priority order with retries (see generate)"""
         # Try each model in order
         for model_idx, model_info in enumerate(self.models):
             logger.info(f"🔍 Trying model: {model_info['name']}")
             for attempt in range(max_retries):
                 try:
                     # Build message chain
-                    messages = [SystemMessage(content=system_prompt)]
-                    
-                    # Add conversation history
-                    if conversation_history:
-                        for msg in conversation_history:
-                            if msg["role"] == "user":
-                                messages.append(HumanMessage(content=msg["content"]))
-                            elif msg["role"] == "assistant":
-                                messages.append(AIMessage(content=msg["content"]))
-                    
-                    # Add current user message
-                    messages.append(HumanMessage(content=user_message))
+                    messages = self._build_messages(system_prompt, user_message, conversation_history)
                     
                     logger.info(f"🔍 Invoking {model_info['name']} with {len(messages)} messages")
                     
-                    # Generate response (handle different model types)
-                    if model_info["type"] == "ollama":
-                        # Ollama doesn't use chat format, combine messages
-                        full_prompt = f"{system_prompt}\n\nUser: {user_message}"
-                        response_text = model_info["client"].invoke(full_prompt)
-                        logger.info(f"✅ Response from {model_info['name']}: {response_text[:100]}")
-                        return response_text
-                    else:
-                        # ChatGoogleGenerativeAI uses messages
-                        response = model_info["client"].invoke(messages)
-                        logger.info(f"✅ Response from {model_info['name']}: {response.content[:100]}")
-                        return response.content
+                    # Both models take the same message list; models without a
+                    # json_client rely on the prompt for JSON output
+                    client = model_info.get("json_client", model_info["client"]) if json_mode else model_info["client"]
+                    response = await asyncio.wait_for(
+                        client.ainvoke(messages), timeout=self.request_timeout
+                    )
+                    logger.info(f"✅ Response from {model_info['name']}: {response.content[:100]}")
+                    self._cache_response(cache_key, response.content)
+                    return response.content
                 
                 except Exception as e:
                     logger.warning(
@@ -144,6 +213,150 @@ class MultiModelAI:
         # All models failed
         return "I'm experiencing technical difficulties. Please try again in a moment."
     
+    async def generate_stream(
+        self,
+        system_prompt: str,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream an AI response chunk by chunk with automatic fallback
+        
+        A model that fails before producing any output falls through to the
+        next one; once text has been sent it cannot be retracted, so a
+        mid-stream failure just ends the stream.
+        
+        Args:
+            system_prompt: System instructions for the AI
+            user_message: User's question/prompt
+            conversation_history: Previous messages (for context)
+        
+        Yields:
+            Response text chunks
+        """
+        if not self.models:
+            yield "AI service unavailable. Please contact support."
+            return
+        
+        for model_info in self.models:
+            started = False
+            try:
+                logger.info(f"🔍 Streaming from {model_info['name']}")
+                stream = model_info["client"].astream(
+                    self._build_messages(system_prompt, user_message, conversation_history)
+                )
+                
+                async for chunk in stream:
+                    text = chunk.content
+                    if text:
+                        started = True
+                        yield text
+                return
+            
+            except Exception as e:
+                logger.warning(f"⚠️  {model_info['name']} stream failed: {str(e)[:200]}")
+                if started:
+                    return
+        
+        # All models failed
+        yield "I'm experiencing technical difficulties. Please try again in a moment."
+    
+    @staticmethod
+    def _build_messages(
+        system_prompt: str,
+        user_message: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> List[Any]:
+        """Chat message list for chat-format models"""
+        messages = [SystemMessage(content=system_prompt)]
+        
+        # Add conversation history
+        if conversation_history:
+            for msg in conversation_history:
+                if msg["role"] == "user":
+                    messages.append(HumanMessage(content=msg["content"]))
+                elif msg["role"] == "assistant":
+                    messages.append(AIMessage(content=msg["content"]))
+        
+        # Add current user message
+        messages.append(HumanMessage(content=user_message))
+        return messages
+    
+    @staticmethod
+    def _response_cache_key(system_prompt: str, user_message: str, json_mode: bool) -> str:
+        """Digest of everything that determines a history-free response"""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (system_prompt, user_message, "json" if json_mode else "text"):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+    
+    def _cached_response(self, cache_key: str) -> Optional[str]:
+        """Cached response for the key, dropping it if expired"""
+        entry = self._response_cache.get(cache_key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at < time.monotonic():
+            del self._response_cache[cache_key]
+            return None
+        self._response_cache.move_to_end(cache_key)
+        return response
+    
+    def _cache_response(self, cache_key: Optional[str], response: str):
+        """Remember a successful response (no-op for history-bound prompts)"""
+        if cache_key is None:
+            return
+        self._response_cache[cache_key] = (time.monotonic() + self.RESPONSE_CACHE_TTL, response)
+        self._response_cache.move_to_end(cache_key)
+        if len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
+    
+    async def generate_batch(
+        self,
+        requests: List[Tuple[str, str]],
+        max_retries: int = 2
+    ) -> List[str]:
+        """
+        Generate responses for several independent prompts in one round
+        
+        Submits the whole batch to the first available model through
+        LangChain's abatch; any item that fails there goes through the
+        regular generate() fallback chain on its own.
+        
+        Args:
+            requests: (system_prompt, user_message) pairs
+            max_retries: Number of retries per model for failed items
+        
+        Returns:
+            One response per request, in the same order
+        """
+        if not requests:
+            return []
+        if not self.models:
+            return ["AI service unavailable. Please contact support."] * len(requests)
+        
+        model_info = self.models[0]
+        inputs = [
+            self._build_messages(system_prompt, user_message)
+            for system_prompt, user_message in requests
+        ]
+        
+        logger.info(f"🔍 Batch invoking {model_info['name']} with {len(inputs)} prompts")
+        try:
+            outputs = await model_info["client"].abatch(inputs, return_exceptions=True)
+        except Exception as e:
+            logger.warning(f"⚠️  {model_info['name']} batch failed: {str(e)[:200]}")
+            outputs = [e] * len(requests)
+        
+        responses = []
+        for (system_prompt, user_message), output in zip(requests, outputs):
+            if isinstance(output, Exception):
+                responses.append(await self.generate(system_prompt, user_message, max_retries=max_retries))
+            else:
+                responses.append(output.content)
+        return responses
+    
     async def generate_structured(
         self,
         system_prompt: str,
@@ -169,12 +382,11 @@ You must respond ONLY with valid JSON matching this structure:
 
 Do not include any explanation outside the JSON. Just the JSON object."""
 
-        response = await self.generate(enhanced_prompt, user_message)
+        response = await self.generate(enhanced_prompt, user_message, json_mode=True)
         
         # Try to parse JSON
         try:
-            import json
-            return json.loads(response)
+            return orjson.loads(response)
         except Exception as e:
             logger.error(f"Failed to parse JSON response: {response[:200]} - Error: {e}")
             return {"error": "Invalid JSON response", "raw": response}
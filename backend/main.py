@@ -1,20 +1,37 @@
-from fastapi import FastAPI, Depends, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, Depends, HTTPException, WebSocket, WebSocketDisconnect, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse, ORJSONResponse
+from sqlalchemy import func, select, insert
 from sqlalchemy.orm import Session
 from datetime import datetime
-from typing import List, Dict, Any, Optional
-import json
+from typing import List, Dict, Any, Optional, Set, Tuple
+import orjson
+import copy
+import asyncio
 import logging
 import sys
+import time
+import queue
+import atexit
+from logging.handlers import QueueHandler, QueueListener
 import sqlite3
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import uuid
+
+try:
+    import fcntl  # POSIX only
+except ImportError:
+    fcntl = None
 
 # Load environment variables from .env file
 load_dotenv()
 
-from database import get_db, init_database
+from database import get_db, get_db_session, init_database, db_path
 from models import Session as SessionModel, Event, AIInteraction, Feature
 from pydantic import BaseModel
 from ai_helper import AIHelper
@@ -23,40 +40,66 @@ from code_executor import CodeExecutor
 from sql_executor import SQLExecutor
 from problem_manager.data_loader import load_problem_to_duckdb, get_problem_table_names
 from langchain_config import init_ai_engine
-from ai_analyzer import get_analyzer
+from ai_analyzer import get_analyzer, get_analysis_stats
 
-# Configure enhanced logging
+# Configure enhanced logging. Records are formatted by the QueueHandler and
+# written by a background listener thread, so file I/O never blocks the event loop.
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue()
+_log_listener = QueueListener(
+    _log_queue,
+    logging.StreamHandler(sys.stdout),
+    logging.FileHandler(Path(__file__).parent / "app.log")
+)
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('/Users/pratyaksh/UTA/AI_Interview_v1/backend/app.log')
-    ]
+    handlers=[QueueHandler(_log_queue)]
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
 app = FastAPI(
     title="AI Interview Platform API",
     description="Backend API for AI-powered behavioral interview platform",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """GZip large responses, but pass incremental /stream endpoints through untouched"""
+    async def __call__(self, scope, receive, send):
+        # The compressor would hold back small chunks until its buffer fills
+        if scope["type"] == "http" and scope["path"].endswith("/stream"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Response compression for the event/feature/problem payloads. Registered
+# first so it sits inside log_requests and still sees each response's size.
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Error handling middleware
 @app.middleware("http")
 async def log_requests(request, call_next):
-    start_time = datetime.now()
+    start_time = time.perf_counter_ns()
     try:
         response = await call_next(request)
-        process_time = (datetime.now() - start_time).total_seconds()
-        logger.info(f"{request.method} {request.url} - {response.status_code} - {process_time:.3f}s")
+        elapsed_ms = (time.perf_counter_ns() - start_time) / 1_000_000
+        logger.info("%s %s - %s - %.3fms", request.method, request.url, response.status_code, elapsed_ms)
         return response
     except Exception as e:
-        process_time = (datetime.now() - start_time).total_seconds()
-        logger.error(f"{request.method} {request.url} - ERROR: {str(e)} - {process_time:.3f}s")
+        elapsed_ms = (time.perf_counter_ns() - start_time) / 1_000_000
+        logger.error("%s %s - ERROR: %s - %.3fms", request.method, request.url, e, elapsed_ms)
         raise
 
+@app.on_event("startup")
+async def enable_eager_tasks():
+    """Start new tasks eagerly so ones that finish without awaiting skip the scheduler (3.12+)"""
+    if sys.version_info >= (3, 12):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -67,7 +110,6 @@ app.add_middleware(
 )
 
 # Initialize AI engine FIRST (before AIHelper)
-import os
 gemini_key = os.getenv("GEMINI_API_KEY")
 if gemini_key:
     ai_engine = init_ai_engine(gemini_api_key=gemini_key)
@@ -85,8 +127,56 @@ else:
 ai_helper = AIHelper()
 event_processor = EventProcessor()
 code_executor = CodeExecutor(timeout=30)
-# Session-specific SQL executors
-sql_executors: Dict[str, SQLExecutor] = {}
+# Session-specific SQL executors (LRU-bounded; evicted ones are rebuilt on demand)
+SQL_EXECUTOR_CACHE_SIZE = 512
+sql_executors: "OrderedDict[str, SQLExecutor]" = OrderedDict()
+
+def remember_sql_executor(session_id: str, executor: SQLExecutor) -> None:
+    """Cache a session's executor, closing the least recently used one past the limit"""
+    sql_executors[session_id] = executor
+    if len(sql_executors) > SQL_EXECUTOR_CACHE_SIZE:
+        _, evicted = sql_executors.popitem(last=False)
+        evicted.close()
+
+# Schema per problem, tagged with the problems.db version it was read from:
+# every session of a problem loads the same tables until that file changes
+problem_schemas: Dict[int, Tuple[Optional[int], Dict[str, List[Dict[str, str]]]]] = {}
+
+def problems_db_version() -> Optional[int]:
+    """mtime of problems.db, or None when it is missing"""
+    try:
+        return PROBLEMS_DB_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+def get_sql_executor(session_id: str, db: Session) -> SQLExecutor:
+    """Get or create the SQL executor for a session"""
+    executor = sql_executors.get(session_id)
+    if executor is not None:
+        sql_executors.move_to_end(session_id)
+        return executor
+    
+    # Fetch session to get problem_id
+    session = db.query(SessionModel).filter(SessionModel.session_id == session_id).first()
+    
+    if session and session.problem_id:
+        # Executor with problem context, on its own in-memory database
+        executor = SQLExecutor(
+            session_id=session_id,
+            problem_id=session.problem_id,
+            allowed_tables=get_problem_table_names(session.problem_id)
+        )
+        
+        # Load problem data into DuckDB (decoded rows are cached per problem)
+        executor.data_version = problems_db_version()
+        load_problem_to_duckdb(session.problem_id, executor.conn)
+    else:
+        # Fallback: no problem_id (legacy mode)
+        executor = SQLExecutor(session_id=session_id)
+    
+    executor.lock_down()
+    remember_sql_executor(session_id, executor)
+    return executor
 
 # Pydantic models for request/response
 class SessionCreate(BaseModel):
@@ -144,47 +234,177 @@ class EventResponse(BaseModel):
 # WebSocket connection manager
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.session_connections: Dict[str, List[WebSocket]] = {}
+        # Sets: O(1) disconnects, and broadcast order doesn't matter
+        self.active_connections: Set[WebSocket] = set()
+        self.session_connections: Dict[str, Set[WebSocket]] = {}
     
     async def connect(self, websocket: WebSocket, session_id: str):
         await websocket.accept()
-        self.active_connections.append(websocket)
-        if session_id not in self.session_connections:
-            self.session_connections[session_id] = []
-        self.session_connections[session_id].append(websocket)
+        self.active_connections.add(websocket)
+        self.session_connections.setdefault(session_id, set()).add(websocket)
     
     def disconnect(self, websocket: WebSocket, session_id: str):
-        self.active_connections.remove(websocket)
-        if session_id in self.session_connections:
-            self.session_connections[session_id].remove(websocket)
+        self.active_connections.discard(websocket)
+        connections = self.session_connections.get(session_id)
+        if connections is not None:
+            connections.discard(websocket)
+            if not connections:
+                del self.session_connections[session_id]
     
     async def send_to_session(self, session_id: str, message: Dict[str, Any]):
-        if session_id in self.session_connections:
-            for connection in self.session_connections[session_id]:
-                await connection.send_text(json.dumps(message))
+        connections = list(self.session_connections.get(session_id, ()))
+        if connections:
+            # Encode once for every viewer; a failed send doesn't stop the others
+            data = orjson.dumps(message).decode()
+            results = await asyncio.gather(
+                *(connection.send_text(data) for connection in connections),
+                return_exceptions=True
+            )
+            # Drop sockets that failed so later broadcasts skip them
+            for connection, result in zip(connections, results):
+                if isinstance(result, Exception):
+                    self.disconnect(connection, session_id)
 
 manager = ConnectionManager()
 
-# Initialize database on import
-try:
-    init_database()
-    print("Database initialized successfully")
-except Exception as e:
-    print(f"Database initialization error: {e}")
+# Last sequence number handed out per session, seeded from the database on first
+# use. LRU-bounded, and dropped once a session completes; an evicted session is
+# re-seeded from the database. The counters live in this process, so the app
+# must run as a single worker (enforced by acquire_single_worker_lock).
+SEQUENCE_CACHE_SIZE = 1024
+session_sequences: "OrderedDict[str, int]" = OrderedDict()
+
+def next_sequence_number(db: Session, session_id: str, count: int = 1) -> int:
+    """
+    Reserve `count` consecutive event sequence numbers for a session
+    
+    Runs on the event loop without awaiting, so concurrent requests cannot
+    interleave between reading and advancing the counter.
+    
+    Returns:
+        The first reserved sequence number
+    """
+    last = session_sequences.get(session_id)
+    if last is None:
+        last = db.query(func.max(Event.sequence_number)).filter(
+            Event.session_id == session_id
+        ).scalar() or 0
+    session_sequences[session_id] = last + count
+    session_sequences.move_to_end(session_id)
+    if len(session_sequences) > SEQUENCE_CACHE_SIZE:
+        session_sequences.popitem(last=False)
+    return last + 1
+
+def release_sequence_numbers(session_id: str):
+    """Drop a finished session's counter (later events re-seed it from the database)"""
+    session_sequences.pop(session_id, None)
+
+# A second worker would keep its own counters and hand out duplicate sequence
+# numbers, so startup fails unless this process holds the database's lock file
+SINGLE_WORKER_LOCK_PATH = db_path.with_name(db_path.name + ".lock")
+_single_worker_lock_file = None
+
+@app.on_event("startup")
+async def acquire_single_worker_lock():
+    """Refuse to start when another worker already serves this database"""
+    global _single_worker_lock_file
+    if fcntl is None:
+        return
+    
+    lock_file = open(SINGLE_WORKER_LOCK_PATH, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        raise RuntimeError(
+            f"Another worker holds {SINGLE_WORKER_LOCK_PATH}; run the backend as a single worker"
+        )
+    # Held (and the lock with it) until the process exits
+    _single_worker_lock_file = lock_file
+
+# Initialize database on import (SKIP_DB_INIT=1 skips it, e.g. for tooling that only imports the app)
+if not os.getenv("SKIP_DB_INIT"):
+    try:
+        init_database()
+        print("Database initialized successfully")
+    except Exception as e:
+        print(f"Database initialization error: {e}")
 
 # Problem API endpoints
 PROBLEMS_DB_PATH = Path(__file__).parent / "problems.db"
 
+# A problem's tables with their row counts; served by idx_table_data_problem
+# (problem_id, table_name) from problem_manager/init_db.py
+TABLES_WITH_ROW_COUNTS_SQL = """
+    SELECT pt.table_name, pt.schema_json, COUNT(td.id)
+    FROM problem_tables pt
+    LEFT JOIN table_data td
+        ON td.problem_id = pt.problem_id AND td.table_name = pt.table_name
+    WHERE pt.problem_id = ?
+    GROUP BY pt.table_name, pt.schema_json
+    ORDER BY pt.table_name
+"""
+
+# Parsed problems.db reads, keyed by (loader name, *args) -> (file mtime_ns, result)
+PROBLEM_CACHE_SIZE = 128
+_problem_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_problem_cache_lock = threading.Lock()
+
+# One long-lived read-only connection per worker thread
+_problems_local = threading.local()
+
 def get_problems_db():
-    """Get connection to problems database"""
-    if not PROBLEMS_DB_PATH.exists():
+    """Get this thread's connection to the problems database (opened once and reused)"""
+    try:
+        inode = PROBLEMS_DB_PATH.stat().st_ino
+    except FileNotFoundError:
         raise HTTPException(status_code=500, detail="Problems database not found. Run problem_manager/init_db.py")
-    return sqlite3.connect(PROBLEMS_DB_PATH)
+    
+    conn = getattr(_problems_local, "conn", None)
+    # init_db.py deletes and recreates the file, so reopen if it was replaced
+    if conn is None or _problems_local.inode != inode:
+        if conn is not None:
+            conn.close()
+        conn = sqlite3.connect(PROBLEMS_DB_PATH)
+        conn.execute("PRAGMA query_only = 1")
+        conn.execute("PRAGMA cache_size = -65536")
+        conn.execute("PRAGMA mmap_size = 268435456")
+        _problems_local.conn = conn
+        _problems_local.inode = inode
+    return conn
 
 
+def read_problems_cached(loader, *args):
+    """
+    Call a problems.db loader, reusing its result until the file changes
+    
+    Entries are invalidated by the database file's mtime, so re-running
+    init_db.py or manage_problems.py is picked up on the next request.
+    Callers get their own copy and may modify it freely.
+    """
+    try:
+        mtime = PROBLEMS_DB_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return loader(*args)  # Let the loader report the missing database
+    
+    key = (loader.__name__, *args)
+    with _problem_cache_lock:
+        entry = _problem_cache.get(key)
+        if entry is not None and entry[0] == mtime:
+            _problem_cache.move_to_end(key)
+            return copy.deepcopy(entry[1])
+    
+    result = loader(*args)
+    if result is not None:
+        with _problem_cache_lock:
+            _problem_cache[key] = (mtime, copy.deepcopy(result))
+            _problem_cache.move_to_end(key)
+            if len(_problem_cache) > PROBLEM_CACHE_SIZE:
+                _problem_cache.popitem(last=False)
+    return result
+
 def get_problem_context(problem_id: int) -> Optional[Dict[str, Any]]:
-    """Get problem context for AI prompts"""
+    """Get problem context for AI prompts (blocking; call via read_problems_cached in a thread)"""
     try:
         conn = get_problems_db()
         cursor = conn.cursor()
@@ -198,29 +418,14 @@ def get_problem_context(problem_id: int) -> Optional[Dict[str, Any]]:
         
         problem_row = cursor.fetchone()
         if not problem_row:
-            conn.close()
             return None
         
-        # Get table details
-        cursor.execute("""
-            SELECT table_name, schema_json
-            FROM problem_tables
-            WHERE problem_id = ?
-            ORDER BY table_name
-        """, (problem_id,))
+        # Get table details with row counts in one grouped query
+        cursor.execute(TABLES_WITH_ROW_COUNTS_SQL, (problem_id,))
         
         tables = []
-        for row in cursor.fetchall():
-            table_name, schema_json = row
-            schema = json.loads(schema_json)
-            
-            # Count rows
-            cursor.execute("""
-                SELECT COUNT(*)
-                FROM table_data
-                WHERE problem_id = ? AND table_name = ?
-            """, (problem_id, table_name))
-            row_count = cursor.fetchone()[0]
+        for table_name, schema_json, row_count in cursor.fetchall():
+            schema = orjson.loads(schema_json)
             
             tables.append({
                 "name": table_name,
@@ -228,8 +433,6 @@ def get_problem_context(problem_id: int) -> Optional[Dict[str, Any]]:
                 "row_count": row_count
             })
         
-        conn.close()
-        
         return {
             "id": problem_row[0],
             "title": problem_row[1],
@@ -241,116 +444,168 @@ def get_problem_context(problem_id: int) -> Optional[Dict[str, Any]]:
         logger.error(f"Error fetching problem context: {e}")
         return None
 
+async def get_session_problem_context(session: Optional[SessionModel]) -> Optional[Dict[str, Any]]:
+    """Problem context snapshotted at session creation (looked up for older sessions)"""
+    if not session or not session.problem_id:
+        return None
+    snapshot = (session.session_data or {}).get("problem_context")
+    if snapshot is not None:
+        return snapshot
+    return await asyncio.to_thread(read_problems_cached, get_problem_context, session.problem_id)
+
+def load_all_problems() -> List[Dict[str, Any]]:
+    """Read the problem catalog (blocking; endpoints run it in a worker thread)"""
+    conn = get_problems_db()
+    cursor = conn.cursor()
+    
+    cursor.execute("""
+        SELECT p.id, p.title, p.description, p.difficulty, p.created_at,
+               COUNT(DISTINCT pt.table_name) as table_count
+        FROM problems p
+        LEFT JOIN problem_tables pt ON p.id = pt.problem_id
+        GROUP BY p.id
+        ORDER BY p.id
+    """)
+    
+    problems = []
+    for row in cursor.fetchall():
+        problems.append({
+            "id": row[0],
+            "title": row[1],
+            "description": row[2],
+            "difficulty": row[3],
+            "created_at": row[4],
+            "table_count": row[5]
+        })
+    
+    return problems
+
+def problems_etag(problem_id: Optional[int] = None) -> Optional[str]:
+    """Weak ETag for problem responses: changes whenever problems.db is rewritten"""
+    try:
+        mtime = PROBLEMS_DB_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return f'W/"{mtime}-{problem_id or 0}"'
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """True if the client's If-None-Match already names this ETag"""
+    if etag is None:
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+
 @app.get("/api/problems")
-async def get_all_problems():
+async def get_all_problems(request: Request):
     """Get all available interview problems"""
     try:
-        conn = get_problems_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT p.id, p.title, p.description, p.difficulty, p.created_at,
-                   COUNT(DISTINCT pt.table_name) as table_count
-            FROM problems p
-            LEFT JOIN problem_tables pt ON p.id = pt.problem_id
-            GROUP BY p.id
-            ORDER BY p.id
-        """)
+        etag = problems_etag()
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
         
-        problems = []
-        for row in cursor.fetchall():
-            problems.append({
-                "id": row[0],
-                "title": row[1],
-                "description": row[2],
-                "difficulty": row[3],
-                "created_at": row[4],
-                "table_count": row[5]
-            })
-        
-        conn.close()
-        return problems
+        problems = await asyncio.to_thread(read_problems_cached, load_all_problems)
+        headers = {"ETag": etag} if etag else None
+        return ORJSONResponse(content=problems, headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching problems: {str(e)}")
 
+def load_problem(problem_id: int) -> Optional[Dict[str, Any]]:
+    """Read one problem with table details, or None if it does not exist (blocking)"""
+    conn = get_problems_db()
+    cursor = conn.cursor()
+    
+    # Get problem details
+    cursor.execute("""
+        SELECT id, title, description, difficulty, created_at
+        FROM problems
+        WHERE id = ?
+    """, (problem_id,))
+    
+    problem_row = cursor.fetchone()
+    if not problem_row:
+        return None
+    
+    # Get table details with row counts in one grouped query
+    cursor.execute(TABLES_WITH_ROW_COUNTS_SQL, (problem_id,))
+    
+    tables = []
+    for table_name, schema_json, row_count in cursor.fetchall():
+        schema = orjson.loads(schema_json)
+        
+        tables.append({
+            "name": table_name,
+            "schema": schema,
+            "row_count": row_count
+        })
+    
+    return {
+        "id": problem_row[0],
+        "title": problem_row[1],
+        "description": problem_row[2],
+        "difficulty": problem_row[3],
+        "created_at": problem_row[4],
+        "tables": tables
+    }
+
 @app.get("/api/problems/{problem_id}")
-async def get_problem(problem_id: int):
+async def get_problem(problem_id: int, request: Request):
     """Get specific problem with table details"""
     try:
-        conn = get_problems_db()
-        cursor = conn.cursor()
+        etag = problems_etag(problem_id)
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
         
-        # Get problem details
-        cursor.execute("""
-            SELECT id, title, description, difficulty, created_at
-            FROM problems
-            WHERE id = ?
-        """, (problem_id,))
-        
-        problem_row = cursor.fetchone()
-        if not problem_row:
+        problem = await asyncio.to_thread(read_problems_cached, load_problem, problem_id)
+        if not problem:
             raise HTTPException(status_code=404, detail=f"Problem {problem_id} not found")
-        
-        # Get table details
-        cursor.execute("""
-            SELECT table_name, schema_json
-            FROM problem_tables
-            WHERE problem_id = ?
-            ORDER BY table_name
-        """, (problem_id,))
-        
-        tables = []
-        for table_name, schema_json in cursor.fetchall():
-            schema = json.loads(schema_json)
-            
-            # Count rows
-            cursor.execute("""
-                SELECT COUNT(*)
-                FROM table_data
-                WHERE problem_id = ? AND table_name = ?
-            """, (problem_id, table_name))
-            row_count = cursor.fetchone()[0]
-            
-            tables.append({
-                "name": table_name,
-                "schema": schema,
-                "row_count": row_count
-            })
-        
-        conn.close()
-        
-        return {
-            "id": problem_row[0],
-            "title": problem_row[1],
-            "description": problem_row[2],
-            "difficulty": problem_row[3],
-            "created_at": problem_row[4],
-            "tables": tables
-        }
+        headers = {"ETag": etag} if etag else None
+        return ORJSONResponse(content=problem, headers=headers)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching problem: {str(e)}")
 
 # Session endpoints
+
+# Columns the session endpoints return; read as plain rows instead of ORM
+# objects (skips the identity map and the notebook/session_data JSON)
+SESSION_SUMMARY_COLUMNS = (
+    SessionModel.session_id,
+    SessionModel.candidate_name,
+    SessionModel.interviewer_name,
+    SessionModel.problem_statement,
+    SessionModel.problem_id,
+    SessionModel.start_time,
+    SessionModel.end_time,
+    SessionModel.status,
+    SessionModel.phase,
+    SessionModel.submitted_at,
+    SessionModel.ai_insights
+)
+
 @app.get("/api/sessions")
 async def get_all_sessions(db: Session = Depends(get_db)):
     """Get all interview sessions"""
     try:
-        sessions = db.query(SessionModel).order_by(SessionModel.start_time.desc()).all()
-        return [{
+        sessions = db.execute(
+            select(*SESSION_SUMMARY_COLUMNS).order_by(SessionModel.start_time.desc())
+        )
+        # Datetimes are left to orjson, which writes the same ISO format as isoformat()
+        return ORJSONResponse(content=[{
             "session_id": s.session_id,
             "candidate_name": s.candidate_name,
             "interviewer_name": s.interviewer_name,
             "problem_statement": s.problem_statement,
             "problem_id": s.problem_id,
-            "start_time": s.start_time.isoformat(),
-            "end_time": s.end_time.isoformat() if s.end_time else None,
+            "start_time": s.start_time,
+            "end_time": s.end_time,
             "status": s.status,
             "phase": s.phase,
-            "submitted_at": s.submitted_at.isoformat() if s.submitted_at else None,
+            "submitted_at": s.submitted_at,
             "ai_insights": s.ai_insights
-        } for s in sessions]
+        } for s in sessions])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching sessions: {str(e)}")
 
@@ -361,30 +616,28 @@ async def create_session(session_data: SessionCreate, db: Session = Depends(get_
         # If problem_id provided, fetch problem details from problems.db
         problem_statement = session_data.problem_statement
         problem_id = session_data.problem_id
+        extra_data = session_data.session_data
         
         if problem_id:
-            conn = get_problems_db()
-            cursor = conn.cursor()
-            cursor.execute("SELECT title, description FROM problems WHERE id = ?", (problem_id,))
-            problem = cursor.fetchone()
-            conn.close()
+            problem_context = await asyncio.to_thread(read_problems_cached, get_problem_context, problem_id)
             
-            if not problem:
+            if problem_context is None:
                 raise HTTPException(status_code=404, detail=f"Problem {problem_id} not found")
             
             # Use problem description as problem_statement
-            problem_statement = problem[1]  # description
+            problem_statement = problem_context["description"]
+            # Snapshot the context so AI prompts don't look it up again
+            extra_data = {**(extra_data or {}), "problem_context": problem_context}
         
         new_session = SessionModel(
             candidate_name=session_data.candidate_name,
             interviewer_name=session_data.interviewer_name,
             problem_statement=problem_statement,
             problem_id=problem_id,
-            session_data=session_data.session_data
+            session_data=extra_data
         )
         db.add(new_session)
-        db.commit()
-        db.refresh(new_session)
+        db.flush()  # Assigns session_id and column defaults without committing
         
         # Log session start event
         start_event = Event(
@@ -394,9 +647,9 @@ async def create_session(session_data: SessionCreate, db: Session = Depends(get_
             sequence_number=1
         )
         db.add(start_event)
-        db.commit()
         
-        return SessionResponse(
+        # Built before the commit, which expires the loaded attributes
+        response = SessionResponse(
             session_id=new_session.session_id,
             candidate_name=new_session.candidate_name,
             interviewer_name=new_session.interviewer_name,
@@ -406,6 +659,11 @@ async def create_session(session_data: SessionCreate, db: Session = Depends(get_
             end_time=new_session.end_time,
             status=new_session.status
         )
+        db.commit()
+        session_sequences[response.session_id] = 1
+        session_sequences.move_to_end(response.session_id)
+        
+        return response
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error creating session: {str(e)}")
@@ -416,7 +674,8 @@ async def execute_python_code(request: CodeExecutionRequest):
     try:
         logger.info(f"Executing Python code ({len(request.code)} chars)")
         
-        success, stdout, stderr = code_executor.execute_python(request.code)
+        # Blocks until the worker answers (up to the timeout), so run it off the event loop
+        success, stdout, stderr = await asyncio.to_thread(code_executor.execute_python, request.code)
         
         logger.info(f"Execution completed - Success: {success}")
         
@@ -437,7 +696,9 @@ async def execute_python_code(request: CodeExecutionRequest):
 @app.get("/api/sessions/{session_id}", response_model=SessionResponse)
 async def get_session(session_id: str, db: Session = Depends(get_db)):
     """Get session by ID"""
-    session = db.query(SessionModel).filter(SessionModel.session_id == session_id).first()
+    session = db.execute(
+        select(*SESSION_SUMMARY_COLUMNS).where(SessionModel.session_id == session_id)
+    ).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
@@ -469,67 +730,155 @@ async def complete_session(session_id: str, db: Session = Depends(get_db)):
     await event_processor.compute_features(session_id, db)
     
     db.commit()
+    release_sequence_numbers(session_id)
     return {"message": "Session completed successfully"}
 
 # Event endpoints
+
+# Rows fetched and encoded per chunk when streaming a session's events
+EVENT_STREAM_BATCH = 500
+
+# Events are committed by one writer task in batches of whatever has queued up
+# (group commit). Each request awaits its own event's commit before replying,
+# so an acknowledged event is always persisted.
+EVENT_WRITE_BATCH = 500
+_event_queue: "Optional[asyncio.Queue[Tuple[Dict[str, Any], asyncio.Future]]]" = None
+_event_writer_task: Optional[asyncio.Task] = None
+
+def insert_events(rows: List[Dict[str, Any]]) -> List[Optional[Exception]]:
+    """
+    Write events in one transaction, falling back to row by row (blocking)
+    
+    Returns:
+        The error for each row, or None for rows that were committed
+    """
+    try:
+        with get_db_session() as write_db:
+            write_db.execute(insert(Event), rows)
+        return [None] * len(rows)
+    except Exception as e:
+        logger.error(f"Batch event insert failed ({len(rows)} events), retrying individually: {e}")
+    
+    errors: List[Optional[Exception]] = []
+    for row in rows:
+        try:
+            with get_db_session() as write_db:
+                write_db.execute(insert(Event), [row])
+            errors.append(None)
+        except Exception as row_error:
+            logger.error(f"Failed to write event {row['event_type']} for session {row['session_id']}: {row_error}")
+            errors.append(row_error)
+    return errors
+
+async def event_writer(queue: asyncio.Queue):
+    """Background task: commit queued events and resolve their waiters"""
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < EVENT_WRITE_BATCH and not queue.empty():
+            batch.append(queue.get_nowait())
+        
+        try:
+            errors = await asyncio.to_thread(insert_events, [row for row, _ in batch])
+        except Exception as e:
+            errors = [e] * len(batch)
+        
+        for (_, waiter), error in zip(batch, errors):
+            # A waiter whose request was cancelled still had its event written
+            if not waiter.done():
+                if error is None:
+                    waiter.set_result(None)
+                else:
+                    waiter.set_exception(error)
+            queue.task_done()
+
+def get_event_queue() -> asyncio.Queue:
+    """Return the writer's queue, starting the writer on the running loop if needed"""
+    global _event_queue, _event_writer_task
+    loop = asyncio.get_running_loop()
+    if _event_writer_task is None or _event_writer_task.done() or _event_writer_task.get_loop() is not loop:
+        _event_queue = asyncio.Queue()
+        _event_writer_task = loop.create_task(event_writer(_event_queue))
+    return _event_queue
+
+async def write_event(row: Dict[str, Any]):
+    """Queue an event for the writer and return once it is committed"""
+    queue = get_event_queue()
+    waiter = asyncio.get_running_loop().create_future()
+    queue.put_nowait((row, waiter))
+    await waiter
+
+@app.on_event("shutdown")
+async def stop_event_writer():
+    """Let the writer commit what is queued, then stop it"""
+    if _event_writer_task is not None and not _event_writer_task.done():
+        await _event_queue.join()
+        _event_writer_task.cancel()
+
 @app.post("/api/events", response_model=EventResponse)
 async def log_event(event_data: EventCreate, db: Session = Depends(get_db)):
     """Log a behavioral event"""
     try:
         # Get next sequence number
-        last_event = db.query(Event).filter(
-            Event.session_id == event_data.session_id
-        ).order_by(Event.sequence_number.desc()).first()
-        
-        next_sequence = (last_event.sequence_number + 1) if last_event else 1
+        next_sequence = next_sequence_number(db, event_data.session_id)
         
-        new_event = Event(
-            session_id=event_data.session_id,
-            event_type=event_data.event_type,
-            event_metadata=event_data.event_metadata,
-            sequence_number=next_sequence
-        )
-        db.add(new_event)
-        db.commit()
-        db.refresh(new_event)
+        new_event = {
+            "event_id": str(uuid.uuid4()),
+            "session_id": event_data.session_id,
+            "timestamp": datetime.utcnow(),
+            "event_type": event_data.event_type,
+            "event_metadata": event_data.event_metadata,
+            "sequence_number": next_sequence
+        }
+        await write_event(new_event)
+        if event_data.event_type == "INTERVIEW_COMPLETED":
+            release_sequence_numbers(event_data.session_id)
         
         # Send real-time update
         await manager.send_to_session(event_data.session_id, {
             "type": "event_logged",
             "event": {
-                "event_id": new_event.event_id,
-                "event_type": new_event.event_type,
-                "timestamp": new_event.timestamp.isoformat(),
-                "metadata": new_event.event_metadata
+                "event_id": new_event["event_id"],
+                "event_type": new_event["event_type"],
+                "timestamp": new_event["timestamp"],
+                "metadata": new_event["event_metadata"]
             }
         })
         
-        return EventResponse(
-            event_id=new_event.event_id,
-            session_id=new_event.session_id,
-            timestamp=new_event.timestamp,
-            event_type=new_event.event_type,
-            event_metadata=new_event.event_metadata,
-            sequence_number=new_event.sequence_number
-        )
+        return EventResponse(**new_event)
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error logging event: {str(e)}")
 
 @app.get("/api/sessions/{session_id}/events")
-async def get_session_events(session_id: str, db: Session = Depends(get_db)):
-    """Get all events for a session"""
-    events = db.query(Event).filter(
-        Event.session_id == session_id
-    ).order_by(Event.sequence_number).all()
+async def get_session_events(session_id: str):
+    """Get all events for a session (streamed as a JSON array)"""
+    def stream_events():
+        # Runs in the threadpool while the response is sent, so it reads
+        # through its own db session rather than the request's
+        with get_db_session() as stream_db:
+            events = stream_db.execute(
+                select(
+                    Event.event_id, Event.timestamp, Event.event_type,
+                    Event.event_metadata, Event.sequence_number
+                ).where(
+                    Event.session_id == session_id
+                ).order_by(Event.sequence_number).execution_options(yield_per=EVENT_STREAM_BATCH)
+            )
+            
+            yield b"["
+            separator = b""
+            for batch in events.partitions():
+                yield separator + b",".join(orjson.dumps({
+                    "event_id": event.event_id,
+                    "timestamp": event.timestamp,
+                    "event_type": event.event_type,
+                    "metadata": event.event_metadata,
+                    "sequence_number": event.sequence_number
+                }) for event in batch)
+                separator = b","
+            yield b"]"
     
-    return [{
-        "event_id": event.event_id,
-        "timestamp": event.timestamp.isoformat(),
-        "event_type": event.event_type,
-        "metadata": event.event_metadata,
-        "sequence_number": event.sequence_number
-    } for event in events]
+    return StreamingResponse(stream_events(), media_type="application/json")
 
 # AI interaction endpoints
 @app.post("/api/ai/prompt")
@@ -541,9 +890,7 @@ async def ai_prompt(request: AIPromptRequest, db: Session = Depends(get_db)):
         
         # Get session to retrieve problem_id
         session = db.query(SessionModel).filter(SessionModel.session_id == request.session_id).first()
-        problem_context = None
-        if session and session.problem_id:
-            problem_context = get_problem_context(session.problem_id)
+        problem_context = await get_session_problem_context(session)
         
         # Get AI response with mode support and problem context
         ai_response = await ai_helper.process_prompt(
@@ -557,21 +904,20 @@ async def ai_prompt(request: AIPromptRequest, db: Session = Depends(get_db)):
         # Classify intent
         intent = ai_helper.classify_intent(request.user_prompt)
         
-        # Store interaction
+        # Store interaction (id assigned up front so the events can reference
+        # it without flushing first)
+        interaction_id = str(uuid.uuid4())
         interaction = AIInteraction(
+            interaction_id=interaction_id,
             session_id=request.session_id,
             user_prompt=request.user_prompt,
             ai_response=ai_response,
             intent_label=intent,
             context_data=request.context_data
         )
-        db.add(interaction)
         
         # Get next sequence number
-        last_event = db.query(Event).filter(
-            Event.session_id == request.session_id
-        ).order_by(Event.sequence_number.desc()).first()
-        next_seq = (last_event.sequence_number + 1) if last_event else 1
+        next_seq = next_sequence_number(db, request.session_id, 2)
         
         # Log appropriate events based on mode
         if mode == 'interview':
@@ -581,17 +927,18 @@ async def ai_prompt(request: AIPromptRequest, db: Session = Depends(get_db)):
                 event_type="INTERVIEW_ANSWER",
                 event_metadata={
                     "answer": request.user_prompt,
-                    "interaction_id": interaction.interaction_id
+                    "interaction_id": interaction_id
                 },
                 sequence_number=next_seq
             )
-            db.add(prompt_event)
             
             # Check if we should complete the interview (after 5 Q&A pairs)
-            interview_questions = db.query(Event).filter(
-                Event.session_id == request.session_id,
-                Event.event_type == "INTERVIEW_QUESTION"
-            ).count()
+            interview_questions = db.scalar(
+                select(func.count()).select_from(Event).where(
+                    Event.session_id == request.session_id,
+                    Event.event_type == "INTERVIEW_QUESTION"
+                )
+            )
             
             should_complete = interview_questions >= 5
             
@@ -605,14 +952,12 @@ async def ai_prompt(request: AIPromptRequest, db: Session = Depends(get_db)):
                     event_metadata={
                         "message": ai_response,
                         "total_questions": interview_questions,
-                        "interaction_id": interaction.interaction_id
+                        "interaction_id": interaction_id
                     },
                     sequence_number=next_seq + 1
                 )
-                db.add(response_event)
                 
-                # Update session phase
-                session = db.query(SessionModel).filter(SessionModel.session_id == request.session_id).first()
+                # Update session phase (written by the same commit)
                 if session:
                     session.phase = "completed"
                     session.end_time = datetime.utcnow()
@@ -623,11 +968,10 @@ async def ai_prompt(request: AIPromptRequest, db: Session = Depends(get_db)):
                     event_metadata={
                         "question": ai_response,
                         "question_number": interview_questions + 1,
-                        "interaction_id": interaction.interaction_id
+                        "interaction_id": interaction_id
                     },
                     sequence_number=next_seq + 1
                 )
-                db.add(response_event)
         else:
             # Coding mode events
             prompt_event = Event(
@@ -636,11 +980,10 @@ async def ai_prompt(request: AIPromptRequest, db: Session = Depends(get_db)):
                 event_metadata={
                     "prompt": request.user_prompt,
                     "intent": intent,
-                    "interaction_id": interaction.interaction_id
+                    "interaction_id": interaction_id
                 },
                 sequence_number=next_seq
             )
-            db.add(prompt_event)
             
             response_event = Event(
                 session_id=request.session_id,
@@ -648,16 +991,20 @@ async def ai_prompt(request: AIPromptRequest, db: Session = Depends(get_db)):
                 event_metadata={
                     "response": ai_response,
                     "intent": intent,
-                    "interaction_id": interaction.interaction_id
+                    "interaction_id": interaction_id
                 },
                 sequence_number=next_seq + 1
             )
-            db.add(response_event)
         
+        # One add_all and one commit for the interaction and both events
+        completed = response_event.event_type == "INTERVIEW_COMPLETED"
+        db.add_all([interaction, prompt_event, response_event])
         db.commit()
+        if completed:
+            release_sequence_numbers(request.session_id)
         
         return {
-            "interaction_id": interaction.interaction_id,
+            "interaction_id": interaction_id,
             "response": ai_response,
             "intent": intent
         }
@@ -666,6 +1013,75 @@ async def ai_prompt(request: AIPromptRequest, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=f"Error processing AI prompt: {str(e)}")
 
 
+@app.post("/api/ai/prompt/stream")
+async def ai_prompt_stream(request: AIPromptRequest, db: Session = Depends(get_db)):
+    """Send prompt to AI assistant and stream the response as plain text (coding mode)"""
+    mode = request.context_data.get('mode', 'coding') if request.context_data else 'coding'
+    if mode != 'coding':
+        raise HTTPException(status_code=400, detail="Streaming is only available in coding mode")
+    
+    # Get session to retrieve problem_id
+    session = db.query(SessionModel).filter(SessionModel.session_id == request.session_id).first()
+    problem_context = await get_session_problem_context(session)
+    
+    intent = ai_helper.classify_intent(request.user_prompt)
+    
+    async def stream_response():
+        chunks = []
+        async for chunk in ai_helper.process_prompt_stream(
+            request.user_prompt,
+            request.context_data,
+            request.session_id,
+            mode=mode,
+            problem_context=problem_context
+        ):
+            chunks.append(chunk)
+            yield chunk
+        
+        # Store the interaction once the full response is known. The request's
+        # db session may already be closed by the time streaming ends.
+        ai_response = "".join(chunks)
+        try:
+            with get_db_session() as stream_db:
+                interaction = AIInteraction(
+                    session_id=request.session_id,
+                    user_prompt=request.user_prompt,
+                    ai_response=ai_response,
+                    intent_label=intent,
+                    context_data=request.context_data
+                )
+                stream_db.add(interaction)
+                stream_db.flush()  # Assign interaction_id for the event metadata
+                
+                # Get next sequence number
+                next_seq = next_sequence_number(stream_db, request.session_id, 2)
+                
+                stream_db.add(Event(
+                    session_id=request.session_id,
+                    event_type="AI_PROMPT",
+                    event_metadata={
+                        "prompt": request.user_prompt,
+                        "intent": intent,
+                        "interaction_id": interaction.interaction_id
+                    },
+                    sequence_number=next_seq
+                ))
+                stream_db.add(Event(
+                    session_id=request.session_id,
+                    event_type="AI_RESPONSE",
+                    event_metadata={
+                        "response": ai_response,
+                        "intent": intent,
+                        "interaction_id": interaction.interaction_id
+                    },
+                    sequence_number=next_seq + 1
+                ))
+        except Exception as e:
+            logger.error(f"Failed to store streamed AI interaction: {e}")
+    
+    return StreamingResponse(stream_response(), media_type="text/plain; charset=utf-8")
+
+
 @app.post("/api/ai/response-used")
 async def mark_response_used(interaction_id: str, db: Session = Depends(get_db)):
     """Mark AI response as used by candidate"""
@@ -679,10 +1095,7 @@ async def mark_response_used(interaction_id: str, db: Session = Depends(get_db))
     interaction.response_used = True
     
     # Get next sequence number
-    last_event = db.query(Event).filter(
-        Event.session_id == interaction.session_id
-    ).order_by(Event.sequence_number.desc()).first()
-    next_seq = (last_event.sequence_number + 1) if last_event else 1
+    next_seq = next_sequence_number(db, interaction.session_id)
     
     # Log usage event
     usage_event = Event(
@@ -714,11 +1127,8 @@ async def submit_coding_phase(session_id: str, db: Session = Depends(get_db)):
         session.phase = "interview"
         session.submitted_at = datetime.utcnow()
         
-        # Get next sequence number
-        last_event = db.query(Event).filter(
-            Event.session_id == session_id
-        ).order_by(Event.sequence_number.desc()).first()
-        next_seq = (last_event.sequence_number + 1) if last_event else 1
+        # Reserve sequence numbers for the submission, interview start and first question
+        next_seq = next_sequence_number(db, session_id, 3)
         
         # Log phase submission event
         event = Event(
@@ -741,9 +1151,7 @@ async def submit_coding_phase(session_id: str, db: Session = Depends(get_db)):
         db.commit()
         
         # Get problem context for interview question generation
-        problem_context = None
-        if session.problem_id:
-            problem_context = get_problem_context(session.problem_id)
+        problem_context = await get_session_problem_context(session)
         
         # Get SQL query history for context
         sql_queries = db.query(Event).filter(
@@ -810,21 +1218,29 @@ async def analyze_session(session_id: str, db: Session = Depends(get_db)):
         logger.error(f"Analysis error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/metrics/analysis")
+async def get_analysis_metrics():
+    """Stage timings and counters of the session analysis pipeline"""
+    return get_analysis_stats()
+
 # Features endpoint
 @app.get("/api/sessions/{session_id}/features")
 async def get_session_features(session_id: str, db: Session = Depends(get_db)):
     """Get computed behavioral features for a session"""
-    features = db.query(Feature).filter(
-        Feature.session_id == session_id
+    features = db.execute(
+        select(
+            Feature.feature_name, Feature.feature_value, Feature.confidence_score,
+            Feature.evidence, Feature.computed_at
+        ).where(Feature.session_id == session_id)
     ).all()
     
-    return [{
+    return ORJSONResponse(content=[{
         "feature_name": feature.feature_name,
         "feature_value": feature.feature_value,
         "confidence_score": feature.confidence_score,
         "evidence": feature.evidence,
-        "computed_at": feature.computed_at.isoformat()
-    } for feature in features]
+        "computed_at": feature.computed_at
+    } for feature in features])
 
 # SQL execution endpoint
 @app.post("/api/execute-sql", response_model=CodeExecutionResponse)
@@ -833,81 +1249,39 @@ async def execute_sql_code(request: CodeExecutionRequest, db: Session = Depends(
     try:
         # Get or create session-specific SQL executor
         session_id = request.session_id or "default"
+        executor = get_sql_executor(session_id, db)
         
-        if session_id not in sql_executors:
-            # Fetch session to get problem_id
-            session = db.query(SessionModel).filter(SessionModel.session_id == session_id).first()
-            
-            if session and session.problem_id:
-                # Get allowed tables for this problem
-                allowed_tables = get_problem_table_names(session.problem_id)
-                
-                # Create executor with problem context
-                executor = SQLExecutor(
-                    session_id=session_id,
-                    problem_id=session.problem_id,
-                    allowed_tables=allowed_tables
-                )
-                
-                # Load problem data into DuckDB
-                load_problem_to_duckdb(session.problem_id, executor.conn)
-                
-                sql_executors[session_id] = executor
-            else:
-                # Fallback: no problem_id (legacy mode)
-                sql_executors[session_id] = SQLExecutor(session_id=session_id)
-        
-        executor = sql_executors[session_id]
-        success, rows, column_names, execution_time, error = executor.execute_query(request.code)
+        # Run the query off the event loop
+        success, rows, column_names, execution_time, error = await asyncio.to_thread(executor.execute_query, request.code)
         
         # Log SQL_RUN event if session_id provided
-        if request.session_id and success:
+        if request.session_id:
             try:
-                # Get next sequence number
-                last_event = db.query(Event).filter(
-                    Event.session_id == request.session_id
-                ).order_by(Event.sequence_number.desc()).first()
-                next_sequence = (last_event.sequence_number + 1) if last_event else 1
-                
-                sql_event = Event(
-                    session_id=request.session_id,
-                    event_type="SQL_RUN",
-                    event_metadata={
+                if success:
+                    event_metadata = {
                         "query_text": request.code,
                         "execution_time": execution_time,
                         "row_count": len(rows),
                         "success": True
-                    },
-                    sequence_number=next_sequence
-                )
-                db.add(sql_event)
-                db.commit()
-            except Exception as log_error:
-                logger.error(f"Failed to log SQL_RUN event: {log_error}")
-        
-        # Log errors
-        if request.session_id and not success:
-            try:
-                last_event = db.query(Event).filter(
-                    Event.session_id == request.session_id
-                ).order_by(Event.sequence_number.desc()).first()
-                next_sequence = (last_event.sequence_number + 1) if last_event else 1
-                
-                error_event = Event(
-                    session_id=request.session_id,
-                    event_type="SQL_RUN",
-                    event_metadata={
+                    }
+                else:
+                    event_metadata = {
                         "query_text": request.code,
                         "execution_time": execution_time,
                         "success": False,
                         "error_message": error
-                    },
-                    sequence_number=next_sequence
-                )
-                db.add(error_event)
-                db.commit()
+                    }
+                
+                await write_event({
+                    "event_id": str(uuid.uuid4()),
+                    "session_id": request.session_id,
+                    "timestamp": datetime.utcnow(),
+                    "event_type": "SQL_RUN",
+                    "event_metadata": event_metadata,
+                    "sequence_number": next_sequence_number(db, request.session_id)
+                })
             except Exception as log_error:
-                logger.error(f"Failed to log SQL error event: {log_error}")
+                logger.error(f"Failed to log SQL_RUN event: {log_error}")
         
         # Format output message for display
         output_msg = ""
@@ -944,10 +1318,25 @@ async def get_database_schema(session_id: Optional[str] = None):
     try:
         # Get or create session-specific SQL executor
         sid = session_id or "default"
-        if sid not in sql_executors:
-            sql_executors[sid] = SQLExecutor(session_id=sid)
+        executor = sql_executors.get(sid)
+        if executor is None:
+            executor = SQLExecutor(session_id=sid)
+            executor.lock_down()
+            remember_sql_executor(sid, executor)
+        else:
+            sql_executors.move_to_end(sid)
         
-        schema = sql_executors[sid].get_schema_info()
+        if executor.problem_id is None:
+            return {"schema": executor.get_schema_info()}
+        
+        entry = problem_schemas.get(executor.problem_id)
+        if entry is not None and entry[0] == executor.data_version:
+            return {"schema": entry[1]}
+        
+        schema = executor.get_schema_info()
+        # Sessions loaded before a problems.db edit must not overwrite the newer schema
+        if entry is None or (executor.data_version or 0) >= (entry[0] or 0):
+            problem_schemas[executor.problem_id] = (executor.data_version, schema)
         return {"schema": schema}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching schema: {str(e)}")
@@ -973,6 +1362,10 @@ async def save_notebook(session_id: str, request: NotebookSaveRequest, db: Sessi
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
+        # Autosave re-sends unchanged notebooks; skip rewriting the row for those
+        if session.notebook_data and session.notebook_data.get("cells") == request.cells:
+            return {"success": True, "message": f"Saved {len(request.cells)} cells"}
+        
         # Save notebook data
         session.notebook_data = {
             "cells": request.cells,
@@ -1026,4 +1419,4 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True, loop="uvloop", http="httptools")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, JSON, Integer, ForeignKey, Boolean, Float
+from sqlalchemy import Column, String, DateTime, Text, JSON, Integer, ForeignKey, Boolean, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -26,8 +26,14 @@ class Session(Base):
     notebook_data = Column(JSON, nullable=True)  # Saved notebook cells and outputs
     
     # Relationships
-    events = relationship("Event", back_populates="session", cascade="all, delete-orphan")
-    ai_interactions = relationship("AIInteraction", back_populates="session", cascade="all, delete-orphan")
+    events = relationship(
+        "Event", back_populates="session", cascade="all, delete-orphan",
+        order_by="Event.sequence_number"
+    )
+    ai_interactions = relationship(
+        "AIInteraction", back_populates="session", cascade="all, delete-orphan",
+        order_by="AIInteraction.timestamp"
+    )
     features = relationship("Feature", back_populates="session", cascade="all, delete-orphan")
 
 class Event(Base):
@@ -43,6 +49,11 @@ class Event(Base):
     
     # Relationships
     session = relationship("Session", back_populates="events")
+    
+    __table_args__ = (
+        Index("ix_events_session_seq", "session_id", "sequence_number"),
+        Index("ix_events_session_type", "session_id", "event_type"),
+    )
 
 class AIInteraction(Base):
     """AI assistant interaction model"""
@@ -59,6 +70,10 @@ class AIInteraction(Base):
     
     # Relationships
     session = relationship("Session", back_populates="ai_interactions")
+    
+    __table_args__ = (
+        Index("ix_ai_interactions_session_ts", "session_id", "timestamp"),
+    )
 
 class Feature(Base):
     """Recruiter insight features model"""
@@ -74,6 +89,10 @@ class Feature(Base):
     
     # Relationships
     session = relationship("Session", back_populates="features")
+    
+    __table_args__ = (
+        Index("ix_features_session", "session_id"),
+    )
 
 # ============================================================================
 # EVENT TAXONOMY
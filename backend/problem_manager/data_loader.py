@@ -4,24 +4,36 @@ Load problem data from problems.db into DuckDB for session execution.
 
 import sqlite3
 import json
+from collections import OrderedDict
 from pathlib import Path
+from threading import Lock
+from typing import List, Tuple
 
 DB_PATH = Path(__file__).parent.parent / "problems.db"
 
-def load_problem_to_duckdb(problem_id: int, duckdb_conn):
+# Decoded tables per problem, so each session's database is filled from
+# memory instead of re-reading and re-parsing problems.db. Entries carry the
+# file's mtime and are re-read once init_db.py or manage_problems.py changes it.
+PROBLEM_DATA_CACHE_SIZE = 64
+_problem_data: "OrderedDict[int, Tuple[int, List[Tuple[str, list, List[list]]]]]" = OrderedDict()
+_problem_data_lock = Lock()
+
+def _read_problem_tables(problem_id: int) -> List[Tuple[str, list, List[list]]]:
     """
-    Load all tables for a problem into DuckDB with aliased names.
-    
-    Tables are created as: tablename_problemid
-    Example: customers_3, orders_3
+    Read a problem's tables from problems.db, cached per problem until the file changes.
     
-    Args:
-        problem_id: Problem ID to load
-        duckdb_conn: DuckDB connection object
+    Returns: List of (table_name, schema, rows) tuples
     """
+    try:
+        mtime = DB_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Problems database not found: {DB_PATH}") from None
     
-    if not DB_PATH.exists():
-        raise FileNotFoundError(f"Problems database not found: {DB_PATH}")
+    with _problem_data_lock:
+        entry = _problem_data.get(problem_id)
+        if entry is not None and entry[0] == mtime:
+            _problem_data.move_to_end(problem_id)
+            return entry[1]
     
     sqlite_conn = sqlite3.connect(DB_PATH)
     cursor = sqlite_conn.cursor()
@@ -31,18 +43,47 @@ def load_problem_to_duckdb(problem_id: int, duckdb_conn):
         "SELECT table_name, schema_json FROM problem_tables WHERE problem_id = ?",
         (problem_id,)
     )
-    tables = cursor.fetchall()
+    
+    tables = []
+    for table_name, schema_json in cursor.fetchall():
+        # Get all rows for this table
+        cursor.execute(
+            "SELECT row_json FROM table_data WHERE problem_id = ? AND table_name = ?",
+            (problem_id, table_name)
+        )
+        rows = [json.loads(row_json) for (row_json,) in cursor.fetchall()]
+        tables.append((table_name, json.loads(schema_json), rows))
+    
+    sqlite_conn.close()
+    
+    with _problem_data_lock:
+        _problem_data[problem_id] = (mtime, tables)
+        _problem_data.move_to_end(problem_id)
+        if len(_problem_data) > PROBLEM_DATA_CACHE_SIZE:
+            _problem_data.popitem(last=False)
+    return tables
+
+def load_problem_to_duckdb(problem_id: int, duckdb_conn):
+    """
+    Load all tables for a problem into DuckDB with aliased names.
+    
+    Tables are created as: tablename_problemid
+    Example: customers_3, orders_3
+    
+    Args:
+        problem_id: Problem ID to load
+        duckdb_conn: DuckDB connection object
+    """
+    
+    tables = _read_problem_tables(problem_id)
     
     if not tables:
         print(f"⚠️  No tables found for problem {problem_id}")
-        sqlite_conn.close()
         return
     
     loaded_tables = []
     
-    for table_name, schema_json in tables:
-        schema = json.loads(schema_json)
-        
+    for table_name, schema, row_values in tables:
         # Create aliased table name
         aliased_name = f"{table_name}_{problem_id}"
         
@@ -61,28 +102,27 @@ def load_problem_to_duckdb(problem_id: int, duckdb_conn):
             print(f"⚠️  Error creating table {aliased_name}: {e}")
             continue
         
-        # Get all rows for this table
-        cursor.execute(
-            "SELECT row_json FROM table_data WHERE problem_id = ? AND table_name = ?",
-            (problem_id, table_name)
-        )
-        rows = cursor.fetchall()
-        
         # Insert rows
-        if rows:
+        if row_values:
             placeholders = ', '.join(['?'] * len(schema))
             insert_sql = f"INSERT INTO {aliased_name} VALUES ({placeholders})"
             
-            for (row_json,) in rows:
-                row_data = json.loads(row_json)
-                try:
-                    duckdb_conn.execute(insert_sql, row_data)
-                except Exception as e:
-                    print(f"⚠️  Error inserting row into {aliased_name}: {e}")
+            # One transaction and one executemany per table instead of an
+            # autocommitted INSERT per row
+            try:
+                duckdb_conn.begin()
+                duckdb_conn.executemany(insert_sql, row_values)
+                duckdb_conn.commit()
+            except Exception:
+                duckdb_conn.rollback()
+                # Retry row by row so only the bad rows are skipped
+                for row_data in row_values:
+                    try:
+                        duckdb_conn.execute(insert_sql, row_data)
+                    except Exception as e:
+                        print(f"⚠️  Error inserting row into {aliased_name}: {e}")
         
-        loaded_tables.append((table_name, aliased_name, len(rows)))
-    
-    sqlite_conn.close()
+        loaded_tables.append((table_name, aliased_name, len(row_values)))
     
     print(f"✅ Loaded {len(loaded_tables)} tables for problem {problem_id}:")
     for original, aliased, row_count in loaded_tables:
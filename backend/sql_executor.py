@@ -2,8 +2,9 @@
 import duckdb
 import re
 import time
+from collections import OrderedDict
 from typing import Tuple, List, Dict, Any, Optional
-from threading import Thread
+from threading import Thread, Lock, Timer
 import signal
 
 class SQLExecutor:
@@ -13,6 +14,14 @@ class SQLExecutor:
     BLOCKED_KEYWORDS = ['DROP', 'DELETE', 'UPDATE', 'INSERT', 'ALTER', 'CREATE', 'TRUNCATE', 'REPLACE', 'ATTACH', 'DETACH']
     MAX_ROWS = 5000
     TIMEOUT_SECONDS = 30
+    # Recent results kept per executor; writes are blocked, so re-running an
+    # unchanged query can reuse them
+    RESULT_CACHE_SIZE = 32
+    # Queries whose result can differ between runs are never cached
+    VOLATILE_PATTERN = re.compile(
+        r'\b(RANDOM|SETSEED|UUID|GEN_RANDOM_UUID|NOW|CURRENT_DATE|CURRENT_TIME|CURRENT_TIMESTAMP|SAMPLE|TABLESAMPLE)\b',
+        re.IGNORECASE
+    )
     
     def __init__(self, session_id: str = "default", problem_id: Optional[int] = None, allowed_tables: Optional[List[str]] = None):
         """Initialize DuckDB with session-specific in-memory database
@@ -25,9 +34,22 @@ class SQLExecutor:
         self.session_id = session_id
         self.problem_id = problem_id
         self.allowed_tables = allowed_tables or []
+        # problems.db mtime the loaded tables came from (set by the loader's caller)
+        self.data_version: Optional[int] = None
         self.conn = duckdb.connect(':memory:')
-        # Note: Tables are loaded externally via load_problem_to_duckdb()
+        # Note: Tables are loaded externally via load_problem_to_duckdb(),
+        # then lock_down() is called
+        self._result_cache: "OrderedDict[str, Tuple[List[Dict[str, Any]], List[str]]]" = OrderedDict()
+        self._result_cache_lock = Lock()
     
+    def lock_down(self):
+        """Stop queries from reaching files, extensions or settings
+        
+        Called once the tables are loaded. The keyword check only gives a
+        friendly error; this is what DuckDB itself enforces.
+        """
+        self.conn.execute("SET enable_external_access = false")
+        self.conn.execute("SET lock_configuration = true")
     
     def _rewrite_query_with_aliases(self, query: str) -> str:
         """Rewrite query to use aliased table names.
@@ -112,7 +134,9 @@ class SQLExecutor:
             - column_names: List of column names
             - execution_time: Execution time in seconds
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
+        cursor = None
+        timer = None
         
         try:
             # Step 1: Validate table access
@@ -133,39 +157,74 @@ class SQLExecutor:
             if rewritten_query.strip().upper().startswith('SELECT'):
                 modified_query = self._add_limit_if_needed(rewritten_query)
             
-            # Execute query with timeout
-            result = self.conn.execute(modified_query)
+            # Only plain reads are cached
+            cacheable = (
+                rewritten_query.lstrip().upper().startswith(('SELECT', 'WITH'))
+                and not self.VOLATILE_PATTERN.search(modified_query)
+            )
+            if cacheable:
+                with self._result_cache_lock:
+                    cached = self._result_cache.get(modified_query)
+                    if cached is not None:
+                        self._result_cache.move_to_end(modified_query)
+                if cached is not None:
+                    # Each hit gets its own row dicts, so a caller changing its
+                    # result can't alter the cache
+                    rows, column_names = cached
+                    return True, [dict(row) for row in rows], list(column_names), time.perf_counter() - start_time, ""
+            
+            # Execute query with timeout, on its own cursor so concurrent
+            # requests from the session don't share connection state
+            cursor = self.conn.cursor()
+            # Interrupt queries (e.g. runaway cross joins) still running after TIMEOUT_SECONDS
+            timer = Timer(self.TIMEOUT_SECONDS, cursor.interrupt)
+            timer.daemon = True
+            timer.start()
+            result = cursor.execute(modified_query)
             
             # Check if it's a query that returns results
             if result.description:
                 column_names = [desc[0] for desc in result.description]
-                rows_tuples = result.fetchall()
+                # Never materialize more than MAX_ROWS, even when the query's
+                # own LIMIT (or one in a subquery) kept ours from being added
+                rows_tuples = result.fetchmany(self.MAX_ROWS)
                 
-                # Convert to list of dicts
-                rows = []
-                for row_tuple in rows_tuples:
-                    row_dict = {}
-                    for i, col_name in enumerate(column_names):
-                        # Convert to JSON-serializable types
-                        value = row_tuple[i]
-                        if hasattr(value, 'isoformat'):  # Date/datetime
-                            value = value.isoformat()
-                        row_dict[col_name] = value
-                    rows.append(row_dict)
+                # Convert to list of dicts, with dates/datetimes as ISO strings
+                rows = [
+                    {
+                        col_name: value.isoformat() if hasattr(value, 'isoformat') else value
+                        for col_name, value in zip(column_names, row_tuple)
+                    }
+                    for row_tuple in rows_tuples
+                ]
                 
-                execution_time = time.time() - start_time
+                if cacheable:
+                    with self._result_cache_lock:
+                        # Stored as copies: the rows returned below belong to this caller
+                        self._result_cache[modified_query] = (tuple(dict(row) for row in rows), tuple(column_names))
+                        if len(self._result_cache) > self.RESULT_CACHE_SIZE:
+                            self._result_cache.popitem(last=False)
+                
+                execution_time = time.perf_counter() - start_time
                 return True, rows, column_names, execution_time, ""
             else:
                 # Query executed but returned nothing (shouldn't happen with SELECT-only)
-                execution_time = time.time() - start_time
+                execution_time = time.perf_counter() - start_time
                 return True, [], [], execution_time, ""
                 
         except duckdb.Error as e:
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
+            if execution_time >= self.TIMEOUT_SECONDS:
+                return False, [], [], execution_time, f"Query timed out ({self.TIMEOUT_SECONDS}s limit)"
             return False, [], [], execution_time, f"SQL Error: {str(e)}"
         except Exception as e:
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
             return False, [], [], execution_time, f"Error: {str(e)}"
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if cursor is not None:
+                cursor.close()
     
     def get_schema_info(self) -> Dict[str, List[Dict[str, str]]]:
         """
@@ -175,24 +234,16 @@ class SQLExecutor:
         schema = {}
         
         try:
-            # Get all tables
-            tables_result = self.conn.execute(
-                "SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'"
-            ).fetchall()
+            # Columns of every table in one query, grouped by table below
+            columns_result = self.conn.execute('''
+                SELECT table_name, column_name, data_type
+                FROM information_schema.columns
+                WHERE table_schema = 'main'
+                ORDER BY table_name, ordinal_position
+            ''').fetchall()
             
-            for (table_name,) in tables_result:
-                # Get column info for each table
-                columns_result = self.conn.execute(f'''
-                    SELECT column_name, data_type 
-                    FROM information_schema.columns 
-                    WHERE table_name = '{table_name}'
-                    ORDER BY ordinal_position
-                ''').fetchall()
-                
-                schema[table_name] = [
-                    {"name": col_name, "type": col_type}
-                    for col_name, col_type in columns_result
-                ]
+            for table_name, col_name, col_type in columns_result:
+                schema.setdefault(table_name, []).append({"name": col_name, "type": col_type})
         
         except Exception:
             # Fallback to basic schema
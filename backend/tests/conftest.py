@@ -0,0 +1,12 @@
+"""Shared test setup: backend modules are imported top-level, as in main.py
+
+Run from the backend directory with: python -m pytest tests
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Importing main must not create or migrate the real database
+os.environ.setdefault("SKIP_DB_INIT", "1")
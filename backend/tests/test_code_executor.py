@@ -0,0 +1,83 @@
+"""Isolation and limits of CodeExecutor runs"""
+import os
+import time
+
+import pytest
+
+from code_executor import CodeExecutor, resource
+
+
+def test_runs_code_and_captures_output():
+    success, stdout, stderr = CodeExecutor(timeout=10).execute_python("print(6 * 7)")
+    
+    assert success
+    assert stdout == "42\n"
+    assert stderr == ""
+
+
+def test_failing_code_reports_traceback():
+    success, _, stderr = CodeExecutor(timeout=10).execute_python("1 / 0")
+    
+    assert not success
+    assert "ZeroDivisionError" in stderr
+
+
+def test_state_does_not_leak_between_runs():
+    executor = CodeExecutor(timeout=10)
+    executor.execute_python("import json\nleaked = 1\njson.dumps = None")
+    
+    success, stdout, stderr = executor.execute_python(
+        "import json\nprint(json.dumps([1]))\nprint(leaked)"
+    )
+    
+    assert not success
+    assert stdout == "[1]\n"
+    assert "NameError" in stderr
+
+
+def test_timeout_is_reported():
+    start = time.monotonic()
+    success, _, stderr = CodeExecutor(timeout=1).execute_python("while True:\n    pass")
+    
+    assert not success
+    assert "timed out" in stderr
+    assert time.monotonic() - start < 5
+
+
+def _is_running(pid: int) -> bool:
+    """True while the process exists and is not a zombie"""
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc to inspect processes")
+def test_timeout_kills_spawned_processes(tmp_path):
+    pid_file = tmp_path / "child.pid"
+    code = (
+        "import subprocess, sys, time\n"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+        f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+        "time.sleep(60)\n"
+    )
+    
+    success, _, _ = CodeExecutor(timeout=2).execute_python(code)
+    
+    assert not success
+    child_pid = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while _is_running(child_pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _is_running(child_pid)
+
+
+@pytest.mark.skipif(resource is None, reason="rlimits need the resource module")
+def test_cpu_limit_cannot_be_raised():
+    success, _, stderr = CodeExecutor(timeout=5).execute_python(
+        "import resource\nresource.setrlimit(resource.RLIMIT_CPU, (100, 100))"
+    )
+    
+    assert not success
+    assert "ValueError" in stderr
@@ -0,0 +1,77 @@
+"""Which MultiModelAI.generate calls are served from the response cache"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain_community")
+pytest.importorskip("langchain_google_genai")
+
+from langchain_config import MultiModelAI
+
+
+class _Reply:
+    def __init__(self, content: str):
+        self.content = content
+
+
+class _CountingClient:
+    """Stands in for a chat model; answers with the number of calls so far"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    async def ainvoke(self, messages):
+        self.calls += 1
+        return _Reply(f"reply {self.calls}")
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    monkeypatch.setattr(MultiModelAI, "_init_models", lambda self: None)
+    engine = MultiModelAI()
+    engine.models = [{"name": "Fake", "client": _CountingClient()}]
+    return engine
+
+
+def _calls(engine) -> int:
+    return engine.models[0]["client"].calls
+
+
+def test_prompt_without_history_is_cached(engine):
+    async def run():
+        first = await engine.generate("system", "question")
+        second = await engine.generate("system", "question")
+        return first, second
+    
+    first, second = asyncio.run(run())
+    
+    assert first == second == "reply 1"
+    assert _calls(engine) == 1
+
+
+def test_empty_history_is_not_cached(engine):
+    async def run():
+        await engine.generate("system", "question", conversation_history=[])
+        await engine.generate("system", "question", conversation_history=[])
+    
+    asyncio.run(run())
+    
+    assert _calls(engine) == 2
+
+
+def test_use_cache_false_bypasses_cache(engine):
+    async def run():
+        await engine.generate("system", "question")
+        return await engine.generate("system", "question", use_cache=False)
+    
+    assert asyncio.run(run()) == "reply 2"
+    assert _calls(engine) == 2
+
+
+def test_key_covers_prompts_and_json_mode():
+    key = MultiModelAI._response_cache_key("system", "question", False)
+    
+    assert key == MultiModelAI._response_cache_key("system", "question", False)
+    assert key != MultiModelAI._response_cache_key("system", "question", True)
+    assert key != MultiModelAI._response_cache_key("other", "question", False)
+    assert key != MultiModelAI._response_cache_key("system", "other", False)
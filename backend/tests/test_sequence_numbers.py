@@ -0,0 +1,74 @@
+"""Event sequence number reservation in main.next_sequence_number"""
+from collections import OrderedDict
+
+import pytest
+
+pytest.importorskip("duckdb")
+pytest.importorskip("langchain_community")
+pytest.importorskip("langchain_google_genai")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import main
+from models import Base, Event
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setattr(main, "session_sequences", OrderedDict())
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _add_events(db, session_id: str, count: int):
+    db.add_all([
+        Event(session_id=session_id, event_type="X", event_metadata={}, sequence_number=n)
+        for n in range(1, count + 1)
+    ])
+    db.commit()
+
+
+def test_new_session_starts_at_one(db):
+    assert main.next_sequence_number(db, "s") == 1
+    assert main.next_sequence_number(db, "s") == 2
+
+
+def test_seeded_from_stored_events(db):
+    _add_events(db, "s", 3)
+    
+    assert main.next_sequence_number(db, "s") == 4
+
+
+def test_reservations_do_not_overlap(db):
+    first = main.next_sequence_number(db, "s", 3)
+    second = main.next_sequence_number(db, "s", 2)
+    
+    assert first == 1
+    assert second == 4
+    assert main.next_sequence_number(db, "s") == 6
+
+
+def test_released_session_is_reseeded(db):
+    _add_events(db, "s", 2)
+    main.next_sequence_number(db, "s")
+    
+    main.release_sequence_numbers("s")
+    
+    assert "s" not in main.session_sequences
+    assert main.next_sequence_number(db, "s") == 3
+
+
+def test_counters_are_lru_bounded(db, monkeypatch):
+    monkeypatch.setattr(main, "SEQUENCE_CACHE_SIZE", 2)
+    
+    main.next_sequence_number(db, "a")
+    main.next_sequence_number(db, "b")
+    main.next_sequence_number(db, "a")
+    main.next_sequence_number(db, "c")
+    
+    assert list(main.session_sequences) == ["a", "c"]